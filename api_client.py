@@ -0,0 +1,448 @@
+"""
+Shared HTTP client for the MCP servers
+Keeps one long-lived aiohttp session with a keep-alive connection pool so
+tool calls reuse TCP connections instead of opening a new one per request.
+Read responses are cached for a short time, marked stale by any write and
+revalidated with ETags (If-None-Match) once stale. Identical concurrent
+reads are coalesced into a single upstream request (single-flight).
+With API_TRANSPORT=inprocess the app is called directly through ASGI
+instead of over HTTP, for an MCP server running in the same process.
+An API_BASE_URL of unix:///path/to/app.sock (or API_UNIX_SOCKET) talks HTTP
+over a Unix domain socket instead of loopback TCP.
+With TRACE_FILE set, every request carries a W3C traceparent header.
+"""
+import asyncio
+import importlib
+import json
+import os
+import re
+import time
+import aiohttp
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import unquote, urlencode
+from tool_metrics import record_upstream
+from tracing import tracer
+
+# Configuration (overridable through the environment)
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+API_UNIX_SOCKET = os.getenv("API_UNIX_SOCKET")
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "100"))
+API_POOL_SIZE_PER_HOST = int(os.getenv("API_POOL_SIZE_PER_HOST", "20"))
+API_KEEPALIVE_TIMEOUT = float(os.getenv("API_KEEPALIVE_TIMEOUT", "30"))
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "5"))
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "256"))
+# Share one upstream request between identical concurrent reads (single-flight)
+API_COALESCE_READS = os.getenv("API_COALESCE_READS", "true").lower() in ("1", "true", "yes")
+# "http" talks to a running app server, "inprocess" imports API_APP and calls it directly
+API_TRANSPORT = os.getenv("API_TRANSPORT", "http")
+API_APP = os.getenv("API_APP", "app:app")
+
+# GET endpoints whose responses may be cached; /health and /dice/roll must stay live
+# (matched exactly, so the NDJSON exports and future routes are never cached)
+CACHEABLE_PATHS = re.compile(r"/|/users(/\d+)?|/tasks|/stats(/tasks)?")
+
+def is_cacheable(endpoint: str) -> bool:
+    """Return True if GET responses from this endpoint may be served from cache"""
+    path = endpoint.split("?", 1)[0]
+    return CACHEABLE_PATHS.fullmatch(path) is not None
+
+
+class CacheEntry:
+    """A cached response body with its freshness deadline and ETag"""
+
+    __slots__ = ("expires_at", "value", "etag")
+
+    def __init__(self, expires_at: float, value: Any, etag: Optional[str]):
+        self.expires_at = expires_at
+        self.value = value
+        self.etag = etag
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+
+class ResponseCache:
+    """TTL + LRU cache for GET responses keyed by endpoint and query parameters
+
+    Fresh entries are served without contacting the app. Stale entries that
+    carry an ETag are revalidated with a conditional GET, so an unchanged
+    collection costs a bodiless 304 instead of a full download.
+    """
+
+    def __init__(self, ttl: float = API_CACHE_TTL, max_size: int = API_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Hashable:
+        return (endpoint, tuple(sorted((params or {}).items())))
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry for key, fresh or stale, or None"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def hit(self, entry: CacheEntry) -> Any:
+        """Serve a fresh entry"""
+        self.hits += 1
+        return entry.value
+
+    def revalidated(self, entry: CacheEntry) -> Any:
+        """Serve a stale entry the app confirmed unchanged (304) and refresh it"""
+        self.revalidations += 1
+        entry.expires_at = time.monotonic() + self.ttl
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, etag: Optional[str] = None, fresh: bool = True):
+        """Store a response fetched from the app
+
+        fresh=False stores it already stale (only its ETag is trusted), for
+        responses that raced with a write.
+        """
+        self.misses += 1
+        expires_at = time.monotonic() + self.ttl if fresh else 0.0
+        self._entries[key] = CacheEntry(expires_at, value, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Mark every entry stale; called after each successful write
+
+        Entries are kept so their ETags can still be revalidated: a write to
+        one collection then costs only a 304 for the others.
+        """
+        for entry in self._entries.values():
+            entry.expires_at = 0.0
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.revalidations + self.misses
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.revalidations) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "ttl_seconds": self.ttl,
+        }
+
+
+UNIX_SCHEME = "unix://"
+
+def split_unix_url(base_url: str, unix_socket: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Turn unix:///path/to/app.sock into an HTTP base URL and a socket path"""
+    if base_url.startswith(UNIX_SCHEME):
+        return "http://localhost", base_url[len(UNIX_SCHEME):]
+    return base_url, unix_socket
+
+
+def load_app(target: str = API_APP) -> Any:
+    """Import an ASGI app from a "module:attribute" string"""
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute or "app")
+
+
+class ASGITransport:
+    """Calls an ASGI app in the same process, without opening a socket
+
+    Requests are handed to the app as ASGI scope/receive/send calls, so the
+    loopback TCP hop, the HTTP parser and connection management are skipped
+    while routing, validation and the app's own headers (ETag, ...) behave
+    exactly as over HTTP. The app's lifespan is run on first use and shut
+    down by close().
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._lifespan: Optional[AsyncExitStack] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        """Run the app's startup once per event loop"""
+        loop = asyncio.get_running_loop()
+        if self._lifespan is not None and self._loop is loop:
+            return
+        self._lifespan = AsyncExitStack()
+        self._loop = loop
+        lifespan_context = getattr(getattr(self.app, "router", None), "lifespan_context", None)
+        if lifespan_context is not None:
+            await self._lifespan.enter_async_context(lifespan_context(self.app))
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        body: Optional[bytes],
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, bytes, Optional[str]]:
+        """Send one request with an optional JSON body to the app and return its status, raw body and ETag"""
+        await self.start()
+        path, _, query = endpoint.partition("?")
+        if params:
+            query = "&".join(filter(None, [query, urlencode(params, doseq=True)]))
+        raw_headers = [(b"host", b"inprocess")]
+        if body is not None:
+            raw_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        raw_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 0),
+            "server": ("inprocess", 80),
+        }
+        request_sent = False
+        response_done = asyncio.Event()
+        status = 500
+        response_headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body or b"", "more_body": False}
+            # Streaming responses wait for a disconnect; it comes once the response is complete
+            await response_done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]):
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_done.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            response_done.set()
+        etag = next((value.decode() for name, value in response_headers if name.lower() == b"etag"), None)
+        return status, b"".join(chunks), etag
+
+    async def close(self):
+        """Run the app's shutdown"""
+        if self._lifespan is not None:
+            lifespan, self._lifespan = self._lifespan, None
+            self._loop = None
+            await lifespan.aclose()
+
+
+class ApiClient:
+    """Pooled client for the FastAPI application shared by all tools"""
+
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        pool_size: int = API_POOL_SIZE,
+        pool_size_per_host: int = API_POOL_SIZE_PER_HOST,
+        keepalive_timeout: float = API_KEEPALIVE_TIMEOUT,
+        timeout: float = API_TIMEOUT,
+        connect_timeout: float = API_CONNECT_TIMEOUT,
+        cache_ttl: float = API_CACHE_TTL,
+        cache_size: int = API_CACHE_SIZE,
+        coalesce_reads: bool = API_COALESCE_READS,
+        transport: str = API_TRANSPORT,
+        app: Optional[Any] = None,
+        unix_socket: Optional[str] = API_UNIX_SOCKET,
+    ):
+        base_url, self.unix_socket = split_unix_url(base_url, unix_socket)
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        # A size of 0 disables response caching; a TTL of 0 revalidates every read
+        self.cache = ResponseCache(cache_ttl, cache_size) if cache_size > 0 else None
+        self.coalesce_reads = coalesce_reads
+        if transport not in ("http", "inprocess"):
+            raise ValueError(f"Unknown API transport '{transport}', expected 'http' or 'inprocess'")
+        self.transport = transport
+        # In-process mode calls the app directly; pass app or set API_APP to choose it
+        self._asgi = ASGITransport(app if app is not None else load_app()) if transport == "inprocess" else None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Single-flight state: in-flight reads keyed by request and write generation
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._write_generation = 0
+        self.upstream_reads = 0
+        self.coalesced_reads = 0
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session bound to the running event loop"""
+        if self.unix_socket:
+            connector = aiohttp.UnixConnector(
+                path=self.unix_socket,
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+        else:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        # A session cannot be reused across event loops (e.g. several asyncio.run calls)
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = self._create_session()
+            self._loop = loop
+            self._inflight.clear()
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Any] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Make HTTP request to FastAPI server, serving cacheable GETs from the cache"""
+        method = method.upper()
+        if method == "GET" and is_cacheable(endpoint):
+            key = ResponseCache.make_key(endpoint, params)
+            if self.cache is not None:
+                entry = self.cache.get(key)
+                if entry is not None and entry.fresh:
+                    return self.cache.hit(entry)
+            if not self.coalesce_reads:
+                self.upstream_reads += 1
+                return await self._fetch(key, endpoint, params)
+            return await self._single_flight(key, lambda: self._fetch(key, endpoint, params))
+        status, body, _ = await self._send(method, endpoint, data, params)
+        if method != "GET" and status < 400:
+            self._write_generation += 1
+            if self.cache is not None:
+                self.cache.invalidate()
+        return body
+
+    async def _single_flight(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Share one upstream request between identical concurrent reads
+
+        The flight is keyed by the write generation too, so a read issued
+        after a write never joins a request that started before it. The
+        fetch runs as its own task: a cancelled caller does not cancel it
+        for the others.
+        """
+        flight_key = (key, self._write_generation)
+        flight = self._inflight.get(flight_key)
+        if flight is None:
+            self.upstream_reads += 1
+            flight = asyncio.ensure_future(fetch())
+            self._inflight[flight_key] = flight
+            flight.add_done_callback(lambda done: self._end_flight(flight_key, done))
+        else:
+            self.coalesced_reads += 1
+        return await asyncio.shield(flight)
+
+    def _end_flight(self, flight_key: Hashable, done: "asyncio.Future[Any]"):
+        if self._inflight.get(flight_key) is done:
+            del self._inflight[flight_key]
+        if not done.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled
+            done.exception()
+
+    async def _fetch(self, key: Hashable, endpoint: str, params: Optional[Dict[str, Any]]) -> Any:
+        """Fetch a cacheable read, revalidating a stale cache entry by ETag"""
+        generation = self._write_generation
+        entry = self.cache.get(key) if self.cache is not None else None
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else None
+        status, body, etag = await self._send("GET", endpoint, None, params, headers)
+        if self.cache is None:
+            return body
+        if status == 304 and entry is not None:
+            return self.cache.revalidated(entry)
+        if status == 200:
+            self.cache.set(key, body, etag, fresh=generation == self._write_generation)
+        return body
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Any],
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Any, Optional[str]]:
+        """Send one request and return its status, decoded body and ETag
+
+        The time and bytes on the wire are charged to the tool call in progress,
+        and with tracing on the request gets a span and a traceparent header.
+        """
+        payload = json.dumps(data).encode() if data is not None else None
+        with tracer.span(f"{method} {endpoint}", "mcp") as span:
+            headers = tracer.inject(headers)
+            start = time.perf_counter()
+            if self._asgi is not None:
+                status, content, etag = await self._asgi.request(method, endpoint, payload, params, headers)
+            else:
+                if payload is not None:
+                    headers = {**(headers or {}), "Content-Type": "application/json"}
+                session = await self.get_session()
+                url = f"{self.base_url}{endpoint}"
+                async with session.request(method, url, data=payload, params=params, headers=headers) as response:
+                    status, content, etag = response.status, await response.read(), response.headers.get("ETag")
+            record_upstream(time.perf_counter() - start, len(payload) if payload else 0, len(content))
+            span.set("http.method", method)
+            span.set("http.target", endpoint)
+            span.set("http.status_code", status)
+            span.set("http.response_bytes", len(content))
+        # 304 Not Modified has no body
+        return status, json.loads(content) if status != 304 and content else None, etag
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return counters of the response cache and of read coalescing"""
+        stats = {"enabled": True, **self.cache.stats()} if self.cache is not None else {"enabled": False}
+        stats["single_flight"] = {
+            "enabled": self.coalesce_reads,
+            "upstream_reads": self.upstream_reads,
+            "coalesced_reads": self.coalesced_reads,
+            "in_flight": len(self._inflight),
+        }
+        return stats
+
+    async def close(self):
+        """Close the pooled session and its connections, or shut down an in-process app"""
+        if self._asgi is not None:
+            await self._asgi.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def __aenter__(self) -> "ApiClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -1,36 +1,90 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any
-import random
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, List, Dict, Any, Literal, Optional, Union
+import os
 import datetime
 import json
+from models import User, Task, DiceRoll, DiceSummary, UserCreate, TaskCreate
+from fast_json import FastJSONResponse, dumps
+from storage import create_store
+from metrics import MetricsMiddleware, MetricsRegistry
+from tracing import TracingMiddleware, tracer
+import profiler
+import dice
 
-app = FastAPI(title="Sample FastAPI App", version="1.0.0")
-
-# Data models
-class User(BaseModel):
-    id: int
-    name: str
-    email: str
-    age: int
-
-class Task(BaseModel):
-    id: int
-    title: str
-    description: str
-    completed: bool
-    created_at: str
-
-class DiceRoll(BaseModel):
-    sides: int
-    count: int
-    results: List[int]
-
-# In-memory storage (for demo purposes)
-users_db = []
-tasks_db = []
-user_counter = 1
-task_counter = 1
+# Storage backend (in-memory by default, see STORAGE_BACKEND in storage.py)
+store = create_store()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close the store on shutdown"""
+    try:
+        yield
+    finally:
+        store.close()
+        tracer.close()
+
+app = FastAPI(
+    title="Sample FastAPI App",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+
+# Request metrics served at /metrics (set METRICS_ENABLED=false to skip the middleware)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+metrics = MetricsRegistry()
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Continue traces from the traceparent header of MCP requests (set TRACE_FILE to enable)
+if tracer.enabled:
+    app.add_middleware(TracingMiddleware, tracer=tracer, service="app")
+
+# Upper bound for the limit query parameter of the list endpoints
+MAX_PAGE_SIZE = 1000
+
+def page_headers(items: List[Any], limit: Optional[int], etag: str) -> Dict[str, str]:
+    """ETag plus the cursor of the next page when the current page is full"""
+    headers = {"ETag": etag}
+    if limit is not None and len(items) == limit:
+        headers["X-Next-Cursor"] = str(items[-1].id)
+    return headers
+
+def collection_etag(*collections: str) -> str:
+    """Build a weak ETag from the current version of the given collections"""
+    versions = store.versions()
+    parts = [store.instance_id] + [f"{name}{versions[name]}" for name in collections]
+    return f'W/"{"-".join(parts)}"'
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds this ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+# Upper bound for the number of records in one bulk create request
+MAX_BULK_SIZE = 10000
+
+def check_bulk_size(items: List[Any]):
+    """Reject bulk requests that are empty or too large"""
+    if not items or len(items) > MAX_BULK_SIZE:
+        raise HTTPException(status_code=400, detail=f"Bulk requests must contain 1 to {MAX_BULK_SIZE} records")
+
+# Records serialized per chunk of a streaming export
+EXPORT_BATCH_SIZE = 1000
+
+async def ndjson_chunks(batches: Iterable[List[Any]]) -> AsyncIterator[bytes]:
+    """Serialize batches of records as newline-delimited JSON, one chunk per batch
+
+    Runs on the event loop, so each batch is read from the store atomically
+    with respect to concurrent writes.
+    """
+    for batch in batches:
+        yield b"".join(dumps(record) + b"\n" for record in batch)
 
 @app.get("/")
 async def root():
@@ -53,78 +107,203 @@ async def health_check():
 
 # User endpoints
 @app.get("/users", response_model=List[User])
-async def get_users():
-    """Get all users"""
-    return users_db
+async def get_users(
+    request: Request,
+    name_contains: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, ge=0),
+):
+    """Get users, optionally filtered by name and paginated by id cursor"""
+    etag = collection_etag("users")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    users = store.list_users(name_contains=name_contains, cursor=cursor, limit=limit)
+    # Records come validated from the store; skip response_model re-validation
+    return FastJSONResponse(users, headers=page_headers(users, limit, etag))
 
 @app.post("/users", response_model=User)
 async def create_user(name: str, email: str, age: int):
     """Create a new user"""
-    global user_counter
-    user = User(id=user_counter, name=name, email=email, age=age)
-    users_db.append(user)
-    user_counter += 1
+    user = store.create_user(name=name, email=email, age=age)
+    # Writes are acknowledged only once durable (group commit on the WAL backend)
+    await store.sync()
     return user
 
+@app.post("/users/bulk", response_model=List[User])
+async def create_users_bulk(users: List[UserCreate]):
+    """Create several users from a JSON array in one request"""
+    check_bulk_size(users)
+    created = store.create_users(users)
+    await store.sync()
+    return FastJSONResponse(created)
+
+@app.get("/users/export")
+async def export_users():
+    """Stream all users as newline-delimited JSON"""
+    batches = store.iter_users(batch_size=EXPORT_BATCH_SIZE)
+    return StreamingResponse(ndjson_chunks(batches), media_type="application/x-ndjson")
+
 @app.get("/users/{user_id}", response_model=User)
 async def get_user(user_id: int):
     """Get a specific user by ID"""
-    for user in users_db:
-        if user.id == user_id:
-            return user
-    raise HTTPException(status_code=404, detail="User not found")
+    user = store.get_user(user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 # Task endpoints
 @app.get("/tasks", response_model=List[Task])
-async def get_tasks():
-    """Get all tasks"""
-    return tasks_db
+async def get_tasks(
+    request: Request,
+    completed: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, ge=0),
+):
+    """Get tasks, optionally filtered by completion status and paginated by id cursor"""
+    etag = collection_etag("tasks")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    tasks = store.list_tasks(completed=completed, cursor=cursor, limit=limit)
+    return FastJSONResponse(tasks, headers=page_headers(tasks, limit, etag))
+
+@app.get("/tasks/export")
+async def export_tasks(completed: Optional[bool] = None):
+    """Stream tasks as newline-delimited JSON, optionally filtered by completion status"""
+    batches = store.iter_tasks(completed=completed, batch_size=EXPORT_BATCH_SIZE)
+    return StreamingResponse(ndjson_chunks(batches), media_type="application/x-ndjson")
 
 @app.post("/tasks", response_model=Task)
 async def create_task(title: str, description: str):
     """Create a new task"""
-    global task_counter
-    task = Task(
-        id=task_counter,
-        title=title,
-        description=description,
-        completed=False,
-        created_at=datetime.datetime.now().isoformat()
-    )
-    tasks_db.append(task)
-    task_counter += 1
+    task = store.create_task(title=title, description=description)
+    await store.sync()
     return task
 
+@app.post("/tasks/bulk", response_model=List[Task])
+async def create_tasks_bulk(tasks: List[TaskCreate]):
+    """Create several tasks from a JSON array in one request"""
+    check_bulk_size(tasks)
+    created = store.create_tasks(tasks)
+    await store.sync()
+    return FastJSONResponse(created)
+
 @app.put("/tasks/{task_id}/complete")
 async def complete_task(task_id: int):
     """Mark a task as completed"""
-    for task in tasks_db:
-        if task.id == task_id:
-            task.completed = True
-            return {"message": f"Task '{task.title}' marked as completed"}
-    raise HTTPException(status_code=404, detail="Task not found")
+    task = store.complete_task(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    await store.sync()
+    return {"message": f"Task '{task.title}' marked as completed"}
+
+# Dice rolling limits: raw results are capped lower than aggregates, and
+# rolls above the thread threshold run off the event loop
+MAX_DICE_SIDES = int(os.getenv("MAX_DICE_SIDES", "1000000000"))
+MAX_DICE_RESULTS = int(os.getenv("MAX_DICE_RESULTS", "100000"))
+MAX_DICE_COUNT = int(os.getenv("MAX_DICE_COUNT", "10000000"))
+DICE_THREAD_THRESHOLD = 100000
+
+def roll_and_render(sides: int, count: int, aggregate: bool, seed: Optional[int]) -> FastJSONResponse:
+    rolls = dice.roll(sides, count, seed)
+    if aggregate:
+        content = DiceSummary.model_construct(sides=sides, count=count, **dice.summarize(rolls, sides))
+    else:
+        content = DiceRoll.model_construct(sides=sides, count=count, results=dice.results(rolls))
+    return FastJSONResponse(content)
 
 # Dice rolling endpoint
-@app.get("/dice/roll")
-async def roll_dice(sides: int = 6, count: int = 1):
-    """Roll dice with specified sides and count"""
-    if sides < 2 or count < 1:
+@app.get("/dice/roll", response_model=Union[DiceRoll, DiceSummary])
+async def roll_dice(
+    sides: int = 6,
+    count: int = 1,
+    aggregate: bool = False,
+    seed: Optional[int] = Query(None, ge=0),
+):
+    """Roll dice with specified sides and count
+
+    aggregate=true returns sum, mean, variance and histogram instead of every
+    result, and allows far larger counts. A non-negative seed makes the rolls
+    reproducible.
+    """
+    max_count = MAX_DICE_COUNT if aggregate else MAX_DICE_RESULTS
+    if not 2 <= sides <= MAX_DICE_SIDES or count < 1:
         raise HTTPException(status_code=400, detail="Invalid dice parameters")
-    
-    results = [random.randint(1, sides) for _ in range(count)]
-    return DiceRoll(sides=sides, count=count, results=results)
+    if count > max_count:
+        raise HTTPException(
+            status_code=400,
+            detail=f"count must be at most {max_count}" + ("" if aggregate else ", use aggregate=true for more"),
+        )
+    if count < DICE_THREAD_THRESHOLD:
+        return roll_and_render(sides, count, aggregate, seed)
+    return await run_in_threadpool(roll_and_render, sides, count, aggregate, seed)
 
 # Statistics endpoint
 @app.get("/stats")
-async def get_stats():
+async def get_stats(request: Request, response: Response):
     """Get application statistics"""
-    return {
-        "total_users": len(users_db),
-        "total_tasks": len(tasks_db),
-        "completed_tasks": len([t for t in tasks_db if t.completed]),
-        "pending_tasks": len([t for t in tasks_db if not t.completed])
-    }
+    etag = collection_etag("users", "tasks")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+    stats = store.stats()
+    stats["completion_rate"] = stats["completed_tasks"] / stats["total_tasks"] if stats["total_tasks"] else 0.0
+    return stats
+
+@app.get("/stats/tasks")
+async def get_task_stats(
+    request: Request,
+    response: Response,
+    bucket: Literal["hour", "day"] = "hour",
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+):
+    """Tasks created and completed per hour or day, optionally within [since, until)"""
+    etag = collection_etag("tasks")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+    return store.task_breakdown(bucket=bucket, since=since, until=until)
+
+# Metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Request metrics in the Prometheus text format"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Admin endpoints
+@app.get("/admin/profile", response_class=PlainTextResponse)
+async def profile_app(
+    seconds: float = Query(5.0, gt=0, le=profiler.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(profiler.PROFILE_INTERVAL_MS, ge=1, le=1000),
+):
+    """Sample the stacks of the app for a while, in the collapsed (flamegraph) format"""
+    if not profiler.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    try:
+        profile = await profiler.profile(seconds, interval_ms, "app")
+    except profiler.ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    headers = {"X-Profile-Samples": str(profile.samples)}
+    if profile.path:
+        headers["X-Profile-File"] = profile.path
+    return PlainTextResponse(profile.collapsed(), headers=headers)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    workers = int(os.getenv("WORKERS", "1"))
+    # Listen on a Unix domain socket instead of TCP, e.g. APP_UDS=/tmp/app.sock
+    uds = os.getenv("APP_UDS")
+    bind = {"uds": uds} if uds else {"host": "0.0.0.0", "port": 8000}
+    if workers > 1:
+        if not store.multiprocess_safe:
+            raise SystemExit("WORKERS > 1 requires a shared storage backend, set STORAGE_BACKEND=sqlite")
+        # Each worker imports the app and opens its own connection to the shared store
+        uvicorn.run("app:app", workers=workers, **bind)
+    else:
+        uvicorn.run(app, **bind)
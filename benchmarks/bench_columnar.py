@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark task queries on the columnar backend
+Compares InMemoryStore against ColumnarStore for status-filtered pages and
+the per-hour task breakdown behind /stats/tasks, at millions of tasks
+"""
+import argparse
+import datetime
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import TaskCreate
+from storage import ColumnarStore, InMemoryStore
+
+BULK_SIZE = 10000
+
+
+def fill(store, count: int) -> float:
+    """Create count tasks in bulk, complete every third one, return elapsed seconds"""
+    batch = [TaskCreate(title=f"Task {i % 500}", description="Benchmark task") for i in range(BULK_SIZE)]
+    start = time.perf_counter()
+    for offset in range(0, count, BULK_SIZE):
+        store.create_tasks(batch[:count - offset])
+    for task_id in range(1, count + 1, 3):
+        store.complete_task(task_id)
+    return time.perf_counter() - start
+
+
+def timed(query, repeat: int = 5) -> float:
+    """Return the best run of query in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar task backend")
+    parser.add_argument("--count", type=int, default=1000000, help="tasks to create")
+    args = parser.parse_args()
+    since = datetime.datetime.now() - datetime.timedelta(days=1)
+    middle = args.count // 2
+
+    queries = [
+        ("stats", lambda store: store.stats()),
+        ("completed page at middle", lambda store: store.list_tasks(completed=True, cursor=middle, limit=100)),
+        ("pending page at start", lambda store: store.list_tasks(completed=False, limit=100)),
+        ("breakdown per hour", lambda store: store.task_breakdown("hour")),
+        ("breakdown per day, since", lambda store: store.task_breakdown("day", since=since)),
+    ]
+
+    print("🧪 Columnar task backend benchmark")
+    print(f"   {args.count:,} tasks, a third of them completed")
+    print("=" * 60)
+    stores = {"memory": InMemoryStore(), "columnar": ColumnarStore()}
+    for name, store in stores.items():
+        print(f"fill {name:<24}{fill(store, args.count):>10.2f} s")
+    print(f"\n{'query':<30}{'memory':>12}{'columnar':>12}")
+    for label, query in queries:
+        memory, columnar = (timed(lambda: query(store)) for store in stores.values())
+        print(f"{label:<30}{memory:>9.2f} ms{columnar:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
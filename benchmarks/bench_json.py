@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON rendering of large /users responses
+Compares FastAPI's default path (response_model validation, then
+jsonable_encoder and stdlib json) against FastJSONResponse with orjson and
+with its stdlib json fallback, and times a full GET /users in-process
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fast_json
+from api_client import ASGITransport
+from app import app, store
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from models import UserCreate
+
+
+def timed(render) -> float:
+    """Return the best of three runs in milliseconds"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def get_all_users(transport: ASGITransport) -> float:
+    start = time.perf_counter()
+    status, content, _ = await transport.request("GET", "/users", None, None)
+    assert status == 200 and len(json.loads(content)) == len(store.users)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON rendering of /users")
+    parser.add_argument("--rows", type=int, default=100000, help="users in the response")
+    args = parser.parse_args()
+
+    store.create_users([UserCreate(name=f"User {i}", email=f"user{i}@example.com", age=20 + i % 50) for i in range(args.rows)])
+    users = store.list_users()
+    route = next(route for route in app.routes if getattr(route, "path", None) == "/users" and "GET" in route.methods)
+
+    def fastapi_default():
+        content = asyncio.run(serialize_response(field=route.response_field, response_content=users))
+        return JSONResponse(content).body
+
+    orjson_module = fast_json.orjson
+
+    def stdlib_json():
+        fast_json.orjson = None
+        try:
+            return fast_json.FastJSONResponse(users).body
+        finally:
+            fast_json.orjson = orjson_module
+
+    print("🧪 JSON rendering benchmark")
+    print(f"   GET /users with {args.rows:,} rows ({len(fastapi_default()) / 1e6:.1f} MB)")
+    print("=" * 60)
+    print(f"{'fastapi default (validate + json)':<36}{timed(fastapi_default):>10.1f} ms")
+    print(f"{'FastJSONResponse (stdlib json)':<36}{timed(stdlib_json):>10.1f} ms")
+    if orjson_module is not None:
+        print(f"{'FastJSONResponse (orjson)':<36}{timed(lambda: fast_json.FastJSONResponse(users).body):>10.1f} ms")
+    else:
+        print("FastJSONResponse (orjson)           not installed")
+
+    async def full_request():
+        transport = ASGITransport(app)
+        try:
+            return min([await get_all_users(transport) for _ in range(3)])
+        finally:
+            await transport.close()
+
+    print(f"\n{'full GET /users (in-process)':<36}{asyncio.run(full_request()):>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
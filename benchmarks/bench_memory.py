@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory used per stored record
+Compares the compact slotted records held by InMemoryStore against keeping
+one Pydantic model per record (the previous layout), measured with
+tracemalloc including the id-keyed dicts and indexes
+"""
+import argparse
+import datetime
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import Task, TaskCreate, User, UserCreate
+from storage import InMemoryStore
+
+# Realistic repetition: a few hundred distinct names and task titles
+DISTINCT_VALUES = 500
+
+
+def measure(build) -> int:
+    """Return the bytes still allocated by the object build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return allocated
+
+
+def user_batch(count: int):
+    return [UserCreate(name=f"User {i % DISTINCT_VALUES}", email=f"user{i}@example.com", age=20 + i % 50) for i in range(count)]
+
+
+def task_batch(count: int):
+    return [TaskCreate(title=f"Task {i % DISTINCT_VALUES}", description="Benchmark task") for i in range(count)]
+
+
+def build_store(users, tasks, bulk: int) -> InMemoryStore:
+    store = InMemoryStore()
+    for start in range(0, len(users), bulk):
+        store.create_users(users[start:start + bulk])
+    for start in range(0, len(tasks), bulk):
+        store.create_tasks(tasks[start:start + bulk])
+    return store
+
+
+def build_models(users, tasks):
+    created_at = datetime.datetime.now().isoformat()
+    return (
+        {i: User(id=i, **user.model_dump()) for i, user in enumerate(users, 1)},
+        {i: Task(id=i, completed=False, created_at=created_at, **task.model_dump()) for i, task in enumerate(tasks, 1)},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory per stored record")
+    parser.add_argument("--count", type=int, default=200000, help="users and tasks to store")
+    parser.add_argument("--bulk", type=int, default=1000, help="records per bulk create")
+    args = parser.parse_args()
+
+    users, tasks = user_batch(args.count), task_batch(args.count)
+    records = args.count * 2
+
+    print("🧪 Record memory benchmark")
+    print(f"   {args.count:,} users and {args.count:,} tasks, {DISTINCT_VALUES} distinct names/titles")
+    print("=" * 60)
+    models = measure(lambda: build_models(users, tasks))
+    print(f"{'pydantic models in dicts':<32}{models / records:>10.0f} bytes/record")
+    compact = measure(lambda: build_store(users, tasks, args.bulk))
+    print(f"{'InMemoryStore slotted records':<32}{compact / records:>10.0f} bytes/record")
+    print(f"\nsaving: {1 - compact / models:.0%} (store figure includes its secondary indexes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark the MCP tool transports
+Compares tool calls through the HTTP transport (a uvicorn server started
+on a local TCP port or Unix domain socket) against the in-process ASGI
+transport, with the response cache disabled so every call reaches the app
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from api_client import ApiClient
+from simple_mcp_server import SimpleMCPServer
+
+# Tool calls measured for each transport
+CALLS = [
+    ("get_health_status", {}),
+    ("get_user_by_id", {"user_id": 1}),
+    ("get_users_page", {"limit": 100}),
+    ("roll_dice", {"sides": 6, "count": 10}),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(bind: list, ready) -> subprocess.Popen:
+    """Start the app with uvicorn and wait until ready() returns True"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", *bind, "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, "STORAGE_BACKEND": "memory"},
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            if ready():
+                return server
+        except OSError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise SystemExit("❌ uvicorn did not start")
+
+
+def run_against_server(bind: list, ready, client: ApiClient, users: int, repeat: int):
+    server = start_server(bind, ready)
+    try:
+        return asyncio.run(run_calls(client, users, repeat))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def run_calls(client: ApiClient, users: int, repeat: int):
+    """Seed users, then time each tool call, return {tool: calls per second}"""
+    results = {}
+    async with SimpleMCPServer(client=client) as server:
+        batch = [{"name": f"User {i}", "email": f"user{i}@example.com", "age": 30} for i in range(users)]
+        await server.create_users_batch(batch)
+        for tool, args in CALLS:
+            await server.call_tool(tool, **args)  # warm up
+            start = time.perf_counter()
+            for _ in range(repeat):
+                await server.call_tool(tool, **args)
+            results[tool] = repeat / (time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TCP, Unix socket and in-process MCP transports")
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per tool")
+    parser.add_argument("--users", type=int, default=1000, help="users to seed")
+    args = parser.parse_args()
+
+    print("🧪 MCP transport benchmark")
+    print(f"   {args.repeat} sequential calls per tool, cache disabled")
+    print("=" * 60)
+
+    port = free_port()
+    tcp = run_against_server(
+        ["--port", str(port)],
+        lambda: urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1),
+        ApiClient(f"http://127.0.0.1:{port}", cache_size=0),
+        args.users,
+        args.repeat,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app.sock")
+        uds = run_against_server(
+            ["--uds", path],
+            lambda: os.path.exists(path),
+            ApiClient(f"unix://{path}", cache_size=0),
+            args.users,
+            args.repeat,
+        )
+    inprocess = asyncio.run(run_calls(ApiClient(transport="inprocess", cache_size=0), args.users, args.repeat))
+
+    print(f"{'tool':<22}{'http/tcp':>12}{'http/uds':>12}{'inprocess':>12}")
+    for tool, _ in CALLS:
+        print(f"{tool:<22}{tcp[tool]:>10,.0f}/s{uds[tool]:>10,.0f}/s{inprocess[tool]:>10,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Load test the FastAPI app and the MCP tool path
+Starts the app with uvicorn (or targets --url), drives each endpoint over
+HTTP and each MCP tool through SimpleMCPServer at the given concurrency,
+and reports throughput and p50/p95/p99 latency per endpoint and tool.
+Results can be written as JSON and compared against a previous run to
+catch regressions. Tool calls bypass the client's response cache and read
+coalescing unless --cache / --coalesce are given, so by default each tool
+row does the same upstream work as its endpoint row; the mode is part of
+each tool scenario name.
+
+    python benchmarks/load_test.py --concurrency 32 --output before.json
+    python benchmarks/load_test.py --concurrency 32 --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api_client import ApiClient
+from bench_transport import free_port, start_server
+from simple_mcp_server import SimpleMCPServer
+
+# Endpoints driven over HTTP: (method, path, query parameters)
+ENDPOINTS = [
+    ("GET", "/health", None),
+    ("GET", "/users/1", None),
+    ("GET", "/users", {"limit": 100}),
+    ("GET", "/tasks", {"completed": "false", "limit": 100}),
+    ("GET", "/stats", None),
+    ("POST", "/tasks", {"title": "Load test", "description": "Created by load_test.py"}),
+    ("GET", "/dice/roll", {"sides": 6, "count": 10}),
+]
+
+# MCP tools driven through SimpleMCPServer: (tool, arguments)
+TOOLS = [
+    ("get_health_status", {}),
+    ("get_user_by_id", {"user_id": 1}),
+    ("get_users_page", {"limit": 100}),
+    ("get_tasks_page", {"limit": 100, "completed": False}),
+    ("get_app_statistics", {}),
+    ("create_task", {"title": "Load test", "description": "Created by load_test.py"}),
+    ("roll_dice", {"sides": 6, "count": 10}),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def drive(call: Callable[[], Awaitable[bool]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """Run call requests times from concurrency workers and summarize the latencies
+
+    call returns False (or raises) for a failed request.
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                ok = await call()
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+async def run_endpoints(base_url: str, requests: int, concurrency: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(base_url, connector=connector) as session:
+        for method, path, params in ENDPOINTS:
+
+            async def call(method=method, path=path, params=params) -> bool:
+                async with session.request(method, path, params=params) as response:
+                    await response.read()
+                    return response.status < 400
+
+            results[f"endpoint {method} {path}"] = await drive(call, requests, concurrency)
+    return results
+
+
+def tool_mode(cache: bool, coalesce: bool) -> str:
+    """Label of the client features a tool scenario ran with"""
+    features = [name for name, enabled in (("cache", cache), ("coalesce", coalesce)) if enabled]
+    return "+".join(features) or "direct"
+
+
+async def run_tools(base_url: str, requests: int, concurrency: int, cache: bool, coalesce: bool) -> Dict[str, Dict[str, Any]]:
+    """Drive every tool; identical concurrent reads only go upstream once when coalesce is on"""
+    results = {}
+    client = ApiClient(
+        base_url,
+        pool_size=concurrency,
+        pool_size_per_host=concurrency,
+        cache_size=256 if cache else 0,
+        coalesce_reads=coalesce,
+    )
+    mode = tool_mode(cache, coalesce)
+    async with SimpleMCPServer(client=client) as server:
+        for tool, args in TOOLS:
+
+            async def call(tool=tool, args=args) -> bool:
+                result = await server.call_tool(tool, **args)
+                return not (isinstance(result, dict) and "detail" in result)
+
+            # The mode is part of the name, so --compare only matches like with like
+            results[f"tool {tool} [{mode}]"] = await drive(call, requests, concurrency)
+    return results
+
+
+async def seed(base_url: str, users: int, tasks: int):
+    """Create the records the read scenarios page through"""
+    async with aiohttp.ClientSession(base_url) as session:
+        for start in range(0, users, 1000):
+            batch = [{"name": f"User {i}", "email": f"user{i}@example.com", "age": 30} for i in range(start, min(users, start + 1000))]
+            async with session.post("/users/bulk", json=batch) as response:
+                response.raise_for_status()
+        for start in range(0, tasks, 1000):
+            batch = [{"title": f"Task {i}", "description": "Seed task"} for i in range(start, min(tasks, start + 1000))]
+            async with session.post("/tasks/bulk", json=batch) as response:
+                response.raise_for_status()
+
+
+def print_results(results: Dict[str, Dict[str, Any]]):
+    print(f"{'scenario':<44}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<44}{result['throughput_rps']:>10,.0f}{result['p50_ms']:>9.2f}"
+            f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['errors']:>8}"
+        )
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Print the change against a previous run and return the regressed scenarios
+
+    A scenario regresses when its throughput drops, or its p95 latency
+    grows, by more than threshold (a fraction).
+    """
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+    regressions = []
+    print(f"\n📊 Compared to {baseline_path} (regression threshold {threshold:.0%})")
+    print(f"{'scenario':<44}{'req/s':>10}{'p95':>10}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<44}{'new':>10}")
+            continue
+        throughput = result["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0.0
+        p95 = result["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        regressed = throughput < -threshold or p95 > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<44}{throughput:>+10.1%}{p95:>+10.1%}{'  ❌' if regressed else ''}")
+    return regressions
+
+
+async def run(args, base_url: str) -> Dict[str, Dict[str, Any]]:
+    await seed(base_url, args.users, args.tasks)
+    results = {}
+    if args.target in ("all", "endpoints"):
+        results.update(await run_endpoints(base_url, args.requests, args.concurrency))
+    if args.target in ("all", "tools"):
+        results.update(await run_tools(base_url, args.requests, args.concurrency, args.cache, args.coalesce))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the FastAPI app and the MCP tools")
+    parser.add_argument("--url", help="target a running app instead of starting one")
+    parser.add_argument("--target", choices=("all", "endpoints", "tools"), default="all")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint/tool")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--users", type=int, default=1000, help="users to seed")
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks to seed")
+    parser.add_argument("--cache", action="store_true", help="enable the MCP client response cache")
+    parser.add_argument(
+        "--coalesce", action="store_true", help="enable single-flight coalescing of identical concurrent reads"
+    )
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="compare against the JSON results of a previous run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    print("🧪 Load test")
+    print(f"   {args.requests} requests per scenario, concurrency {args.concurrency}")
+    print("=" * 60)
+
+    server: Optional[Any] = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(["--port", str(port)], lambda: urllib.request.urlopen(f"{base_url}/health", timeout=1))
+    try:
+        results = asyncio.run(run(args, base_url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_results(results)
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "url": args.url or "local uvicorn",
+                **{key: getattr(args, key) for key in ("target", "requests", "concurrency", "users", "tasks", "cache", "coalesce")},
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            raise SystemExit(f"\n❌ {len(regressions)} scenario(s) regressed")
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
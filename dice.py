@@ -0,0 +1,58 @@
+"""
+Bulk dice rolling for the /dice/roll endpoint
+Rolls are generated in one vectorized call with NumPy when it is installed
+(pure Python otherwise) and can be reduced to aggregates (sum, mean,
+variance, histogram) instead of returning every result.
+"""
+import collections
+import random
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, pure Python fallback
+    np = None
+
+# Histograms are only computed for dice with at most this many sides
+MAX_HISTOGRAM_SIDES = 1000
+
+
+def roll(sides: int, count: int, seed: Optional[int] = None) -> Any:
+    """Roll count dice with the given number of sides
+
+    Returns a NumPy array when NumPy is available, a list otherwise. The same
+    seed gives the same rolls on the same installation.
+    """
+    if np is not None:
+        return np.random.default_rng(seed).integers(1, sides, size=count, endpoint=True)
+    rng = random.Random(seed)
+    return [rng.randint(1, sides) for _ in range(count)]
+
+
+def results(rolls: Any) -> List[int]:
+    """Convert rolls to a plain list of ints"""
+    return rolls.tolist() if np is not None else rolls
+
+
+def summarize(rolls: Any, sides: int) -> Dict[str, Any]:
+    """Aggregate rolls into sum, mean, population variance and a histogram
+
+    histogram[i] counts the rolls of i + 1; it is None for dice with more
+    than MAX_HISTOGRAM_SIDES sides.
+    """
+    count = len(rolls)
+    histogram = None
+    if np is not None:
+        total = int(rolls.sum())
+        mean = float(rolls.mean())
+        variance = float(rolls.var())
+        if sides <= MAX_HISTOGRAM_SIDES:
+            histogram = np.bincount(rolls, minlength=sides + 1)[1:].tolist()
+    else:
+        total = sum(rolls)
+        mean = total / count
+        variance = sum((value - mean) ** 2 for value in rolls) / count
+        if sides <= MAX_HISTOGRAM_SIDES:
+            counts = collections.Counter(rolls)
+            histogram = [counts[face] for face in range(1, sides + 1)]
+    return {"sum": total, "mean": mean, "variance": variance, "histogram": histogram}
@@ -0,0 +1,46 @@
+"""
+Fast JSON responses for the FastAPI app
+Renders with orjson when it is installed and falls back to the stdlib json
+encoder otherwise. Both serialize store records (anything with to_dict())
+and Pydantic models directly, so handlers can return already-validated
+records without FastAPI re-validating them against response_model and
+walking them through jsonable_encoder.
+"""
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Serialize store records and Pydantic models through their field dict"""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    # Cheaper than isinstance(value, BaseModel), which goes through ABCMeta
+    if hasattr(value, "__pydantic_fields_set__"):
+        return value.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content, which may contain records or Pydantic models, to compact JSON"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, or stdlib json when orjson is missing
+
+    Returning it from a handler bypasses response_model validation, so only
+    pass data that is already validated (records from the store).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
@@ -7,6 +7,9 @@ import google.generativeai as genai
 # Load environment variables
 load_dotenv()
 
+# Maximum number of demo queries sent to Gemini at the same time
+MAX_CONCURRENT_QUERIES = int(os.getenv("MAX_CONCURRENT_QUERIES", "4"))
+
 async def main():
     """Main function to demonstrate Gemini integration with FastMCP"""
     
@@ -32,28 +35,43 @@ async def main():
                 tools=[mcp_client.session]
             )
             
-            # Demo conversations
-            demo_queries = [
-                "Check the health status of the FastAPI application",
-                "Create a new user named 'John Doe' with email 'john@example.com' and age 30",
-                "Create a task called 'Learn FastMCP' with description 'Study FastMCP integration'",
-                "Roll 3 dice with 6 sides each",
-                "Get all users and show me the statistics",
-                "Mark the first task as completed",
-                "Show me all pending tasks"
+            # Demo conversations. Queries in the same stage are independent and
+            # run concurrently; each stage depends on the writes of the previous one
+            demo_stages = [
+                ["Check the health status of the FastAPI application"],
+                [
+                    "Create a new user named 'John Doe' with email 'john@example.com' and age 30",
+                    "Create a task called 'Learn FastMCP' with description 'Study FastMCP integration'",
+                    "Roll 3 dice with 6 sides each",
+                ],
+                ["Get all users and show me the statistics"],
+                ["Mark the first task as completed"],
+                ["Show me all pending tasks"],
             ]
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
             
-            for i, query in enumerate(demo_queries, 1):
-                print(f"\n🔍 Query {i}: {query}")
-                print("-" * 40)
-                
-                try:
-                    response = await model.agenerate_content_async(query)
-                    print(f"🤖 Gemini Response: {response.text}")
-                except Exception as e:
-                    print(f"❌ Error: {str(e)}")
-                
-                print()
+            async def ask(query):
+                async with semaphore:
+                    try:
+                        response = await model.agenerate_content_async(query)
+                        return response.text, None
+                    except Exception as e:
+                        return None, str(e)
+            
+            i = 0
+            for stage in demo_stages:
+                answers = await asyncio.gather(*(ask(query) for query in stage))
+                for query, (text, error) in zip(stage, answers):
+                    i += 1
+                    print(f"\n🔍 Query {i}: {query}")
+                    print("-" * 40)
+                    
+                    if error is None:
+                        print(f"🤖 Gemini Response: {text}")
+                    else:
+                        print(f"❌ Error: {error}")
+                    
+                    print()
                 
     except Exception as e:
         print(f"❌ Error connecting to MCP server: {str(e)}")
@@ -0,0 +1,188 @@
+"""
+Prometheus-style request metrics for the FastAPI app
+MetricsMiddleware is a pure ASGI middleware that records, per method and
+route template, request counts by status, latency and response size
+histograms, plus a gauge of requests in flight. Everything runs on the
+event loop thread, so plain integer counters need no locks, and histogram
+buckets are pre-allocated lists indexed by bisection. Metrics are kept
+per process; with several workers each one reports its own.
+"""
+import bisect
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Histogram bucket upper bounds (Prometheus le labels)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Label for requests that matched no route (404s), so raw paths never become labels
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisection and two additions"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bound plus the +Inf bucket, never resized
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        """Yield (le, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            yield ("+Inf" if bound == float("inf") else repr(bound), total)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of observations"""
+        target = fraction * self.count
+        if not target:
+            return None
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            if total >= target:
+                return bound
+        return None
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Dict[str, Any]) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render_histogram(name: str, labels: Dict[str, Any], histogram: Histogram) -> List[str]:
+    """Prometheus text lines of one histogram series"""
+    lines = [f"{name}_bucket{format_labels({**labels, 'le': le})} {count}" for le, count in histogram.cumulative()]
+    lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+    lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+    return lines
+
+
+class RouteMetrics:
+    """Metrics of one (method, route) pair"""
+
+    __slots__ = ("statuses", "latency", "size")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+
+
+class MetricsRegistry:
+    """Request metrics of the app, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+        self.started_at = time.time()
+
+    def record(self, method: str, route: str, status: int, seconds: float, size: int):
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.latency.observe(seconds)
+        metrics.size.observe(size)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Requests handled, by method, route and status",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f"http_requests_total{format_labels({'method': method, 'route': route, 'status': status})} {count}")
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_request_duration_seconds Request latency until the response body is sent",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines += render_histogram("http_request_duration_seconds", {"method": method, "route": route}, metrics.latency)
+        lines += [
+            "# HELP http_response_size_bytes Response body size",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        for (method, route), metrics in sorted(self.routes.items()):
+            lines += render_histogram("http_response_size_bytes", {"method": method, "route": route}, metrics.size)
+        lines += [
+            "# HELP process_start_time_seconds Start time of the process since the epoch",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {self.started_at}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class RouteLabeler:
+    """Maps a handled request to its route template (/users/{user_id})
+
+    The template is found from the endpoint the router stored in the scope,
+    never the raw path, so the label set stays bounded.
+    """
+
+    def __init__(self):
+        self._route_paths: Dict[Any, str] = {}
+
+    def __call__(self, scope: Dict[str, Any]) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            # Routes are fixed once the app serves, so this runs once per endpoint
+            routes = getattr(scope.get("app"), "routes", ())
+            self._route_paths = {getattr(route, "endpoint", None): route.path for route in routes}
+            path = self._route_paths.get(endpoint, UNMATCHED_ROUTE)
+        return path
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware feeding a MetricsRegistry, labelled by route template"""
+
+    def __init__(self, app: Callable, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+        self._route = RouteLabeler()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        registry = self.registry
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Dict[str, Any]):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            registry.record(scope["method"], self._route(scope), status, time.perf_counter() - start, size)
@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+# Data models
+class User(BaseModel):
+    id: int
+    name: str
+    email: str
+    age: int
+
+class Task(BaseModel):
+    id: int
+    title: str
+    description: str
+    completed: bool
+    created_at: str
+
+class UserCreate(BaseModel):
+    name: str
+    email: str
+    age: int
+
+class TaskCreate(BaseModel):
+    title: str
+    description: str
+
+class DiceRoll(BaseModel):
+    sides: int
+    count: int
+    results: List[int]
+
+class DiceSummary(BaseModel):
+    sides: int
+    count: int
+    sum: int
+    mean: float
+    variance: float
+    histogram: Optional[List[int]]
@@ -0,0 +1,110 @@
+"""
+Opt-in sampling profiler for the FastAPI app and the MCP servers
+A profile samples the stack of every thread of the process at a fixed
+interval for a bounded time, from a worker thread so the event loop keeps
+serving the traffic being profiled. Samples are aggregated as collapsed
+stacks ("thread;outer;...;inner count" lines), the input format of
+flamegraph.pl, speedscope and similar tools. Profiling is off unless
+PROFILING_ENABLED is set; nothing runs until a profile is requested.
+"""
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+from typing import Counter, List, Optional
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+# Upper bound for the duration of one profile
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+# Time between two samples
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# Directory where each profile is also written as a .folded file (optional)
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+
+
+class Profile:
+    """Collapsed stacks collected by one profile"""
+
+    def __init__(self, stacks: Counter[str], samples: int, seconds: float, interval: float):
+        self.stacks = stacks
+        self.samples = samples
+        self.seconds = seconds
+        self.interval = interval
+        self.path: Optional[str] = None
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write(self, directory: str, service: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{service}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.folded")
+        with open(self.path, "w", encoding="utf-8") as profile_file:
+            profile_file.write(self.collapsed())
+        return self.path
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample(seconds: float, interval: float) -> Profile:
+    """Sample the stacks of every other thread for the given time (blocking)"""
+    own_thread = threading.get_ident()
+    stacks: Counter[str] = collections.Counter()
+    samples = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, str(thread_id)))
+            stacks[";".join(reversed(labels))] += 1
+        samples += 1
+        time.sleep(interval)
+    return Profile(stacks, samples, time.perf_counter() - start, interval)
+
+
+# One profile at a time per process, whichever server requested it
+_lock = threading.Lock()
+
+
+def _sample_locked(seconds: float, interval: float) -> Profile:
+    # Released by the sampling thread itself, so a cancelled caller cannot
+    # let a second profile start while this one is still sampling
+    try:
+        return sample(seconds, interval)
+    finally:
+        _lock.release()
+
+
+async def profile(seconds: float, interval_ms: float = PROFILE_INTERVAL_MS, service: str = "app") -> Profile:
+    """Profile the process for seconds (capped at PROFILE_MAX_SECONDS) without blocking the loop
+
+    The profile is also written to PROFILE_DIR when it is set.
+    """
+    if not _lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    seconds = min(seconds, PROFILE_MAX_SECONDS)
+    try:
+        future = asyncio.get_running_loop().run_in_executor(None, _sample_locked, seconds, interval_ms / 1000)
+    except BaseException:
+        _lock.release()
+        raise
+    result = await future
+    if PROFILE_DIR:
+        result.write(PROFILE_DIR, service)
+    return result
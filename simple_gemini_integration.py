@@ -3,6 +3,7 @@ Simplified Gemini integration without fastmcp dependency
 This provides the same functionality as the original gemini_integration.py
 """
 import asyncio
+import itertools
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
@@ -25,57 +26,72 @@ async def simulate_gemini_with_tools():
     print("🤖 Gemini + MCP Integration Demo (Simplified)")
     print("=" * 60)
     
-    # Demo queries with their corresponding MCP tool calls
+    # Demo queries with their corresponding MCP tool calls. Scenarios in the
+    # same stage are independent of each other, later stages read earlier writes
     demo_scenarios = [
         {
             "query": "Check the health status of the FastAPI application",
             "tool": "get_health_status",
-            "args": {}
+            "args": {},
+            "stage": 1
         },
         {
             "query": "Get information about the FastAPI application",
             "tool": "get_app_info", 
-            "args": {}
+            "args": {},
+            "stage": 1
         },
         {
             "query": "Create a new user named 'John Doe' with email 'john@example.com' and age 30",
             "tool": "create_user",
-            "args": {"name": "John Doe", "email": "john@example.com", "age": 30}
+            "args": {"name": "John Doe", "email": "john@example.com", "age": 30},
+            "stage": 2
         },
         {
             "query": "Create a task called 'Learn FastMCP' with description 'Study FastMCP integration'",
             "tool": "create_task",
-            "args": {"title": "Learn FastMCP", "description": "Study FastMCP integration"}
+            "args": {"title": "Learn FastMCP", "description": "Study FastMCP integration"},
+            "stage": 2
         },
         {
             "query": "Roll 3 dice with 6 sides each",
             "tool": "roll_dice",
-            "args": {"sides": 6, "count": 3}
+            "args": {"sides": 6, "count": 3},
+            "stage": 2
         },
         {
             "query": "Get all users and show me the statistics",
             "tool": "get_all_users",
-            "args": {}
+            "args": {},
+            "stage": 3
         },
         {
             "query": "Get application statistics",
             "tool": "get_app_statistics",
-            "args": {}
+            "args": {},
+            "stage": 3
         },
         {
             "query": "Show me all pending tasks",
             "tool": "get_pending_tasks",
-            "args": {}
+            "args": {},
+            "stage": 3
         }
     ]
     
-    for i, scenario in enumerate(demo_scenarios, 1):
+    # Run each stage's tool calls concurrently, one stage after another
+    outcomes = []
+    for _, stage in itertools.groupby(demo_scenarios, key=lambda scenario: scenario['stage']):
+        outcomes.extend(await mcp_server.call_tools(list(stage)))
+    
+    for i, (scenario, outcome) in enumerate(zip(demo_scenarios, outcomes), 1):
         print(f"\n🔍 Query {i}: {scenario['query']}")
         print("-" * 50)
         
         try:
-            # Call the MCP tool
-            result = await call_mcp_tool(scenario['tool'], **scenario['args'])
+            if "error" in outcome:
+                raise RuntimeError(outcome["error"])
+            result = outcome["result"]
             
             # Simulate Gemini's response
             if scenario['tool'] == 'get_health_status':
@@ -160,6 +176,8 @@ async def interactive_mode():
         if not matched:
             print("❌ Command not recognized. Type 'help' for available commands.")
 
+    await mcp_server.close()
+
 async def main():
     """Main function to demonstrate the integration"""
     
@@ -186,6 +204,8 @@ async def main():
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         print("Make sure the FastAPI server is running on http://localhost:8000")
+    finally:
+        await mcp_server.close()
 
 if __name__ == "__main__":
     import sys
@@ -1,101 +1,44 @@
 """
 Simple MCP Server implementation without fastmcp dependency
-This provides the same functionality as the original mcp_server.py
+This provides the same functionality as the original mcp_server.py; both
+are generated from the tool registry in tool_registry.py
 """
 import asyncio
-import aiohttp
-import json
+import os
 from typing import List, Dict, Any, Optional
+from api_client import ApiClient, API_BASE_URL
+from tool_registry import build_tools
+from tool_metrics import tool_metrics
+from tracing import tracer
+
+# Maximum number of tool calls call_tools runs at the same time
+MAX_TOOL_CONCURRENCY = int(os.getenv("MAX_TOOL_CONCURRENCY", "8"))
 
 class SimpleMCPServer:
-    def __init__(self, api_base_url: str = "http://localhost:8000"):
+    def __init__(self, api_base_url: str = API_BASE_URL, client: Optional[ApiClient] = None):
         self.api_base_url = api_base_url
-        self.tools = {
-            "get_health_status": self.get_health_status,
-            "get_app_info": self.get_app_info,
-            "get_all_users": self.get_all_users,
-            "create_user": self.create_user,
-            "get_user_by_id": self.get_user_by_id,
-            "get_all_tasks": self.get_all_tasks,
-            "create_task": self.create_task,
-            "complete_task": self.complete_task,
-            "roll_dice": self.roll_dice,
-            "get_app_statistics": self.get_app_statistics,
-            "search_users_by_name": self.search_users_by_name,
-            "get_pending_tasks": self.get_pending_tasks,
-            "get_completed_tasks": self.get_completed_tasks,
-        }
-
-    async def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make HTTP request to FastAPI server"""
-        url = f"{self.api_base_url}{endpoint}"
-        async with aiohttp.ClientSession() as session:
-            if method.upper() == "GET":
-                async with session.get(url) as response:
-                    return await response.json()
-            elif method.upper() == "POST":
-                async with session.post(url, json=data) as response:
-                    return await response.json()
-            elif method.upper() == "PUT":
-                async with session.put(url, json=data) as response:
-                    return await response.json()
-
-    async def get_health_status(self) -> Dict[str, Any]:
-        """Check the health status of the FastAPI application"""
-        return await self.make_request("GET", "/health")
-
-    async def get_app_info(self) -> Dict[str, Any]:
-        """Get information about the FastAPI application"""
-        return await self.make_request("GET", "/")
-
-    async def get_all_users(self) -> List[Dict[str, Any]]:
-        """Get all users from the FastAPI application"""
-        return await self.make_request("GET", "/users")
-
-    async def create_user(self, name: str, email: str, age: int) -> Dict[str, Any]:
-        """Create a new user in the FastAPI application"""
-        data = {"name": name, "email": email, "age": age}
-        return await self.make_request("POST", "/users", data)
-
-    async def get_user_by_id(self, user_id: int) -> Dict[str, Any]:
-        """Get a specific user by ID from the FastAPI application"""
-        return await self.make_request("GET", f"/users/{user_id}")
-
-    async def get_all_tasks(self) -> List[Dict[str, Any]]:
-        """Get all tasks from the FastAPI application"""
-        return await self.make_request("GET", "/tasks")
-
-    async def create_task(self, title: str, description: str) -> Dict[str, Any]:
-        """Create a new task in the FastAPI application"""
-        data = {"title": title, "description": description}
-        return await self.make_request("POST", "/tasks", data)
-
-    async def complete_task(self, task_id: int) -> Dict[str, Any]:
-        """Mark a task as completed in the FastAPI application"""
-        return await self.make_request("PUT", f"/tasks/{task_id}/complete")
-
-    async def roll_dice(self, sides: int = 6, count: int = 1) -> Dict[str, Any]:
-        """Roll dice using the FastAPI application"""
-        return await self.make_request("GET", f"/dice/roll?sides={sides}&count={count}")
-
-    async def get_app_statistics(self) -> Dict[str, Any]:
-        """Get application statistics from the FastAPI application"""
-        return await self.make_request("GET", "/stats")
-
-    async def search_users_by_name(self, name: str) -> List[Dict[str, Any]]:
-        """Search for users by name in the FastAPI application"""
-        users = await self.get_all_users()
-        return [user for user in users if name.lower() in user.get("name", "").lower()]
-
-    async def get_pending_tasks(self) -> List[Dict[str, Any]]:
-        """Get all pending (incomplete) tasks from the FastAPI application"""
-        tasks = await self.get_all_tasks()
-        return [task for task in tasks if not task.get("completed", False)]
-
-    async def get_completed_tasks(self) -> List[Dict[str, Any]]:
-        """Get all completed tasks from the FastAPI application"""
-        tasks = await self.get_all_tasks()
-        return [task for task in tasks if task.get("completed", False)]
+        self.client = client or ApiClient(api_base_url)
+        # Tools are generated from the registry in tool_registry.py and are
+        # also available as methods, e.g. server.roll_dice(sides=6, count=3)
+        self.tools = build_tools(self.client)
+        for name, tool in self.tools.items():
+            setattr(self, name, tool)
+
+    async def make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make HTTP request to FastAPI server through the shared pooled client"""
+        return await self.client.request(method, endpoint, data, params)
+
+    async def close(self):
+        """Close the pooled HTTP client and write a final metrics dump"""
+        tool_metrics.stop_dumper()
+        tracer.close()
+        await self.client.close()
+
+    async def __aenter__(self) -> "SimpleMCPServer":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
     async def call_tool(self, tool_name: str, **kwargs) -> Any:
         """Call a tool by name with arguments"""
@@ -104,6 +47,26 @@ class SimpleMCPServer:
         else:
             raise ValueError(f"Tool '{tool_name}' not found")
 
+    async def call_tools(self, calls: List[Dict[str, Any]], max_concurrency: int = MAX_TOOL_CONCURRENCY) -> List[Dict[str, Any]]:
+        """Call several independent tools concurrently
+
+        Each call is a dict with "tool" and optional "args". Results are
+        returned in the order of calls as {"tool", "result"} or, when that
+        call failed, {"tool", "error"}, so one failure does not sink the batch.
+        A turn therefore costs roughly the slowest call instead of the sum.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(call: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result = await self.call_tool(call["tool"], **call.get("args", {}))
+                    return {"tool": call["tool"], "result": result}
+                except Exception as e:
+                    return {"tool": call["tool"], "error": str(e)}
+
+        return await asyncio.gather(*(run(call) for call in calls))
+
     def list_tools(self) -> List[str]:
         """List all available tools"""
         return list(self.tools.keys())
@@ -140,4 +103,8 @@ if __name__ == "__main__":
         
         print("🎉 Simple MCP Server test completed!")
 
-    asyncio.run(test_server())
+    async def run_tests():
+        async with mcp_server:
+            await test_server()
+
+    asyncio.run(run_tests())
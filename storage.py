@@ -0,0 +1,1098 @@
+"""
+Storage layer for the FastAPI application
+Records are kept in id-keyed dicts, so lookups and updates are O(1) while
+iteration still follows insertion order for the list endpoints. Aggregate
+counters and secondary indexes (task completion status, case-folded user
+name) are maintained on every write so statistics and filters never scan
+the whole table.
+
+Backends hold compact UserRecord / TaskRecord objects (__slots__, interned
+strings for values that repeat across records) instead of Pydantic models.
+They expose the same attributes, and the app converts them to User / Task
+only at the API boundary (FastAPI validates response_model from attributes,
+fast_json serializes them directly).
+
+Backends (selected with STORAGE_BACKEND):
+- memory: InMemoryStore, nothing survives a restart (default)
+- wal: WALStore, the in-memory store made durable by an append-only log
+- sqlite: SQLiteStore, a shared database file usable by several worker processes
+- columnar: ColumnarStore, in-memory with tasks kept in NumPy columns so
+  counts, status filters and time-range breakdowns are vectorized
+"""
+import asyncio
+import bisect
+import datetime
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from models import UserCreate, TaskCreate
+
+try:
+    import numpy as np
+except ImportError:  # only needed by the columnar backend
+    np = None
+
+# Recompute counters after every write and fail loudly on drift (for tests)
+STORE_CONSISTENCY_CHECK = os.getenv("STORE_CONSISTENCY_CHECK", "").lower() in ("1", "true", "yes")
+
+# Backend selection and write-ahead log settings
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")
+STORAGE_PATH = os.getenv("STORAGE_PATH")
+DEFAULT_STORAGE_PATHS = {"wal": "app_data.wal", "sqlite": "app_data.db"}
+WAL_FSYNC = os.getenv("WAL_FSYNC", "true").lower() in ("1", "true", "yes")
+
+
+# Time buckets of the task breakdown: ISO timestamp prefix length and width in seconds
+BREAKDOWN_BUCKETS = {"hour": (13, 3600), "day": (10, 86400)}
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _naive(moment: datetime.datetime) -> datetime.datetime:
+    """Convert to naive local time, the form task timestamps are stored in"""
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def _bucket_label(prefix: str, bucket: str) -> str:
+    """Turn an ISO timestamp prefix into a bucket label (2024-01-31T09:00 or 2024-01-31)"""
+    return prefix + ":00" if bucket == "hour" else prefix
+
+
+def _breakdown_result(
+    bucket: str,
+    since: Optional[datetime.datetime],
+    until: Optional[datetime.datetime],
+    rows: Iterable[tuple],
+) -> Dict[str, Any]:
+    """Build the task breakdown response from (label, created, completed) rows"""
+    buckets = [
+        {"start": label, "created": created, "completed": completed, "completion_rate": completed / created}
+        for label, created, completed in rows
+    ]
+    total = sum(b["created"] for b in buckets)
+    completed = sum(b["completed"] for b in buckets)
+    return {
+        "bucket": bucket,
+        "since": _naive(since).isoformat() if since else None,
+        "until": _naive(until).isoformat() if until else None,
+        "total_tasks": total,
+        "completed_tasks": completed,
+        "completion_rate": completed / total if total else 0.0,
+        "buckets": buckets,
+    }
+
+
+class UserRecord:
+    """Compact internal form of a user, converted to User at the API boundary"""
+
+    __slots__ = ("id", "name", "email", "age")
+
+    def __init__(self, id: int, name: str, email: str, age: int):
+        self.id = id
+        # Names repeat across users (and across log replays), emails rarely do
+        self.name = sys.intern(name)
+        self.email = email
+        self.age = age
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "email": self.email, "age": self.age}
+
+
+class TaskRecord:
+    """Compact internal form of a task, converted to Task at the API boundary"""
+
+    __slots__ = ("id", "title", "description", "completed", "created_at")
+
+    def __init__(self, id: int, title: str, description: str, completed: bool, created_at: str):
+        self.id = id
+        self.title = sys.intern(title)
+        self.description = sys.intern(description)
+        self.completed = completed
+        # Bulk inserts share one timestamp; interning keeps it shared after a replay
+        self.created_at = sys.intern(created_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "completed": self.completed,
+            "created_at": self.created_at,
+        }
+
+
+def _page(ids: Iterable[int], cursor: Optional[int], limit: Optional[int]) -> Iterable[int]:
+    """Restrict ascending ids to those after the cursor, at most limit of them"""
+    if cursor is not None:
+        ids = itertools.dropwhile(lambda record_id: record_id <= cursor, ids)
+    if limit is not None:
+        ids = itertools.islice(ids, limit)
+    return ids
+
+
+def _sorted_page(ids: List[int], cursor: Optional[int], limit: Optional[int]) -> List[int]:
+    """Like _page, but seeks to the cursor by bisection in a sorted list"""
+    start = bisect.bisect_right(ids, cursor) if cursor is not None else 0
+    end = start + limit if limit is not None else len(ids)
+    return ids[start:end]
+
+
+class SortedIds:
+    """Ascending ids in fixed-size chunks, with a sorted list of chunk maxima
+
+    Adding or removing an id bisects the maxima, then one chunk of at most
+    2 * CHUNK_SIZE ids, so updates stay cheap at millions of ids while a
+    page still seeks to its cursor by bisection.
+    """
+
+    CHUNK_SIZE = 1000
+
+    __slots__ = ("chunks", "maxes", "size")
+
+    def __init__(self):
+        self.chunks: List[List[int]] = []
+        self.maxes: List[int] = []
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        return itertools.chain.from_iterable(self.chunks)
+
+    def add(self, record_id: int):
+        if not self.chunks:
+            self.chunks.append([record_id])
+            self.maxes.append(record_id)
+            self.size = 1
+            return
+        # New ids are usually the largest so far and land at the end of the last chunk
+        index = min(bisect.bisect_left(self.maxes, record_id), len(self.chunks) - 1)
+        chunk = self.chunks[index]
+        bisect.insort(chunk, record_id)
+        self.maxes[index] = chunk[-1]
+        self.size += 1
+        if len(chunk) > 2 * self.CHUNK_SIZE:
+            self.chunks.insert(index + 1, chunk[self.CHUNK_SIZE:])
+            del chunk[self.CHUNK_SIZE:]
+            self.maxes.insert(index, chunk[-1])
+
+    def remove(self, record_id: int):
+        index = bisect.bisect_left(self.maxes, record_id)
+        chunk = self.chunks[index]
+        del chunk[bisect.bisect_left(chunk, record_id)]
+        self.size -= 1
+        if chunk:
+            self.maxes[index] = chunk[-1]
+        else:
+            del self.chunks[index], self.maxes[index]
+
+    def page(self, cursor: Optional[int], limit: Optional[int]) -> List[int]:
+        """Ids greater than cursor, at most limit of them"""
+        index = bisect.bisect_right(self.maxes, cursor) if cursor is not None else 0
+        ids: List[int] = []
+        for chunk in itertools.islice(self.chunks, index, None):
+            start = bisect.bisect_right(chunk, cursor) if cursor is not None else 0
+            ids.extend(chunk[start:start + limit - len(ids)] if limit is not None else chunk[start:])
+            if limit is not None and len(ids) >= limit:
+                break
+        return ids
+
+
+def _batches(fetch_page: Callable[[Optional[int], int], list], batch_size: int) -> Iterator[list]:
+    """Walk a paginated listing with id cursors, yielding one batch at a time"""
+    cursor = None
+    while True:
+        batch = fetch_page(cursor, batch_size)
+        if not batch:
+            return
+        yield batch
+        cursor = batch[-1].id
+
+
+class InMemoryStore:
+    """In-memory storage for users and tasks indexed by id"""
+
+    # Whether several worker processes can safely share this backend
+    multiprocess_safe = False
+
+    def __init__(self, check_consistency: bool = STORE_CONSISTENCY_CHECK):
+        self.users: Dict[int, UserRecord] = {}
+        self.tasks: Dict[int, TaskRecord] = {}
+        self.user_counter = 1
+        self.task_counter = 1
+        self.completed_count = 0
+        # Task status indexes are kept sorted, so pages seek by bisection
+        self.pending_task_ids = SortedIds()
+        self.completed_task_ids = SortedIds()
+        # Dicts with None values act as insertion-ordered sets
+        self.user_name_index: Dict[str, Dict[int, None]] = {}
+        # Bumped on every mutation of a collection; instance_id tells apart
+        # version numbers handed out by different store instances (restarts)
+        self.collection_versions = {"users": 0, "tasks": 0}
+        self.instance_id = uuid.uuid4().hex[:12]
+        self.check_consistency = check_consistency
+
+    # Users
+    def list_users(
+        self,
+        name_contains: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[UserRecord]:
+        """Return users in creation order, optionally filtered by a name substring
+
+        Pagination is id based: only users with an id greater than cursor are
+        returned, at most limit of them.
+        """
+        if name_contains is None:
+            if cursor is None and limit is None:
+                return list(self.users.values())
+            # Ids are allocated sequentially, so seek straight to the cursor
+            start = cursor + 1 if cursor is not None else 1
+            ids = (i for i in range(start, self.user_counter) if i in self.users)
+            return [self.users[user_id] for user_id in _page(ids, None, limit)]
+        needle = name_contains.casefold()
+        # Only distinct names are scanned, never the user records themselves
+        user_ids = sorted(
+            user_id
+            for name, ids in self.user_name_index.items() if needle in name
+            for user_id in ids
+        )
+        return [self.users[user_id] for user_id in _sorted_page(user_ids, cursor, limit)]
+
+    def iter_users(self, batch_size: int = 1000) -> Iterator[List[UserRecord]]:
+        """Yield all users in creation order in batches, without copying the table"""
+        return _batches(lambda cursor, limit: self.list_users(cursor=cursor, limit=limit), batch_size)
+
+    def get_user(self, user_id: int) -> Optional[UserRecord]:
+        """Return a user by id, or None if it does not exist"""
+        return self.users.get(user_id)
+
+    def create_user(self, name: str, email: str, age: int) -> UserRecord:
+        """Store a new user and return it"""
+        user = self._insert_user(UserRecord(self.user_counter, name, email, age))
+        self.user_counter += 1
+        self.collection_versions["users"] += 1
+        self._after_write()
+        return user
+
+    def create_users(self, users: List[UserCreate]) -> List[UserRecord]:
+        """Store a batch of users under one contiguous block of ids"""
+        first_id = self.user_counter
+        self.user_counter += len(users)
+        created = [
+            self._insert_user(UserRecord(first_id + offset, user.name, user.email, user.age))
+            for offset, user in enumerate(users)
+        ]
+        self.collection_versions["users"] += 1
+        self._after_write()
+        return created
+
+    def _insert_user(self, user: UserRecord) -> UserRecord:
+        self.users[user.id] = user
+        self.user_name_index.setdefault(user.name.casefold(), {})[user.id] = None
+        return user
+
+    # Tasks
+    def list_tasks(
+        self,
+        completed: Optional[bool] = None,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[TaskRecord]:
+        """Return tasks in creation order, optionally filtered by completion status
+
+        Pagination works like list_users.
+        """
+        if completed is None:
+            if cursor is None and limit is None:
+                return list(self.tasks.values())
+            start = cursor + 1 if cursor is not None else 1
+            ids = _page((i for i in range(start, self.task_counter) if i in self.tasks), None, limit)
+        else:
+            ids = (self.completed_task_ids if completed else self.pending_task_ids).page(cursor, limit)
+        return [self.tasks[task_id] for task_id in ids]
+
+    def iter_tasks(self, completed: Optional[bool] = None, batch_size: int = 1000) -> Iterator[List[TaskRecord]]:
+        """Yield tasks in creation order in batches, without copying the table
+
+        Every batch seeks to its cursor by bisection, so its cost does not grow
+        with the position in the export, and writes between batches are safe.
+        """
+        return _batches(
+            lambda cursor, limit: self.list_tasks(completed=completed, cursor=cursor, limit=limit),
+            batch_size,
+        )
+
+    def get_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Return a task by id, or None if it does not exist"""
+        return self.tasks.get(task_id)
+
+    def create_task(self, title: str, description: str) -> TaskRecord:
+        """Store a new pending task and return it"""
+        task = self._insert_task(TaskRecord(
+            self.task_counter, title, description, False, datetime.datetime.now().isoformat()
+        ))
+        self.task_counter += 1
+        self.collection_versions["tasks"] += 1
+        self._after_write()
+        return task
+
+    def create_tasks(self, tasks: List[TaskCreate]) -> List[TaskRecord]:
+        """Store a batch of pending tasks under one contiguous block of ids"""
+        first_id = self.task_counter
+        self.task_counter += len(tasks)
+        created_at = datetime.datetime.now().isoformat()
+        created = [
+            self._insert_task(TaskRecord(first_id + offset, task.title, task.description, False, created_at))
+            for offset, task in enumerate(tasks)
+        ]
+        self.collection_versions["tasks"] += 1
+        self._after_write()
+        return created
+
+    def _insert_task(self, task: TaskRecord) -> TaskRecord:
+        self.tasks[task.id] = task
+        if task.completed:
+            self.completed_task_ids.add(task.id)
+            self.completed_count += 1
+        else:
+            self.pending_task_ids.add(task.id)
+        return task
+
+    def complete_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Mark a task as completed, returning None if it does not exist"""
+        task = self.tasks.get(task_id)
+        if task is not None and not task.completed:
+            task.completed = True
+            self.pending_task_ids.remove(task_id)
+            # Tasks are completed out of creation order
+            self.completed_task_ids.add(task_id)
+            self.completed_count += 1
+            self.collection_versions["tasks"] += 1
+            self._after_write()
+        return task
+
+    # Statistics
+    def versions(self) -> Dict[str, int]:
+        """Return the current version number of each collection"""
+        return self.collection_versions
+
+    def stats(self) -> Dict[str, int]:
+        """Return the aggregate counters in O(1)"""
+        total_tasks = len(self.tasks)
+        return {
+            "total_users": len(self.users),
+            "total_tasks": total_tasks,
+            "completed_tasks": self.completed_count,
+            "pending_tasks": total_tasks - self.completed_count,
+        }
+
+    def task_breakdown(
+        self,
+        bucket: str = "hour",
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+    ) -> Dict[str, Any]:
+        """Count tasks created, and how many of them are completed, per hour or day
+
+        Only tasks created in [since, until) are counted. Scans every task;
+        the columnar backend does this with vectorized operations.
+        """
+        prefix_length, _ = BREAKDOWN_BUCKETS[bucket]
+        low = _naive(since).isoformat() if since else ""
+        high = _naive(until).isoformat() if until else None
+        counts: Dict[str, List[int]] = {}
+        for task in self.tasks.values():
+            # ISO timestamps of the same format compare chronologically as strings
+            if task.created_at >= low and (high is None or task.created_at < high):
+                count = counts.setdefault(task.created_at[:prefix_length], [0, 0])
+                count[0] += 1
+                count[1] += task.completed
+        rows = ((_bucket_label(prefix, bucket), *counts[prefix]) for prefix in sorted(counts))
+        return _breakdown_result(bucket, since, until, rows)
+
+    def verify_counters(self):
+        """Recompute counters and indexes from the records and raise if they drifted"""
+        completed_ids = {t.id for t in self.tasks.values() if t.completed}
+        pending_ids = {t.id for t in self.tasks.values() if not t.completed}
+        expected = {
+            "total_users": len(self.users),
+            "total_tasks": len(self.tasks),
+            "completed_tasks": len(completed_ids),
+            "pending_tasks": len(pending_ids),
+        }
+        actual = self.stats()
+        if actual != expected:
+            raise RuntimeError(f"Store counters out of sync: {actual} != {expected}")
+        if list(self.completed_task_ids) != sorted(completed_ids) or list(self.pending_task_ids) != sorted(pending_ids):
+            raise RuntimeError("Task status index out of sync with task records")
+        self._verify_user_index()
+
+    def _verify_user_index(self):
+        indexed_names = {
+            user_id: name for name, ids in self.user_name_index.items() for user_id in ids
+        }
+        if indexed_names != {u.id: u.name.casefold() for u in self.users.values()}:
+            raise RuntimeError("User name index out of sync with user records")
+
+    def _after_write(self):
+        if self.check_consistency:
+            self.verify_counters()
+
+    # Lifecycle
+    async def sync(self):
+        """Wait until every write made so far is durable (nothing to do in memory)"""
+
+    def flush(self):
+        """Persist buffered writes (nothing to do in memory)"""
+
+    def close(self):
+        """Flush and release any resources held by the store"""
+        self.flush()
+
+
+class WALStore(InMemoryStore):
+    """In-memory store made durable by an append-only write-ahead log
+
+    Reads are served from memory exactly like InMemoryStore. Every write is
+    appended to the log as one JSON line holding the resulting records, so
+    replaying the log on startup rebuilds the same ids and timestamps.
+
+    Writes are group-committed: log lines are buffered, and a writer awaits
+    sync() before acknowledging. One flush at a time writes every buffered
+    line and fsyncs them together on a dedicated thread, off the event loop;
+    writers arriving while it runs are committed by the next flush. An
+    acknowledged write is therefore on disk. Synchronous callers use
+    flush(). The log is owned by a single process.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_STORAGE_PATHS["wal"],
+        fsync: bool = WAL_FSYNC,
+        check_consistency: bool = STORE_CONSISTENCY_CHECK,
+    ):
+        super().__init__(check_consistency=check_consistency)
+        self.path = path
+        self.fsync = fsync
+        self._buffer: List[str] = []
+        # Log lines appended so far, and how many of them are durable
+        self._appended = 0
+        self._durable = 0
+        self._flushing: Optional["asyncio.Future[None]"] = None
+        # One thread, so log writes reach the file in submission order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wal-writer")
+        self.recovered_entries = self.recover()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    # Writes: apply in memory, then append to the log
+    def create_user(self, name: str, email: str, age: int) -> UserRecord:
+        user = super().create_user(name, email, age)
+        self._append({"op": "users", "records": [user.to_dict()]})
+        return user
+
+    def create_users(self, users: List[UserCreate]) -> List[UserRecord]:
+        created = super().create_users(users)
+        self._append({"op": "users", "records": [user.to_dict() for user in created]})
+        return created
+
+    def create_task(self, title: str, description: str) -> TaskRecord:
+        task = super().create_task(title, description)
+        self._append({"op": "tasks", "records": [task.to_dict()]})
+        return task
+
+    def create_tasks(self, tasks: List[TaskCreate]) -> List[TaskRecord]:
+        created = super().create_tasks(tasks)
+        self._append({"op": "tasks", "records": [task.to_dict() for task in created]})
+        return created
+
+    def complete_task(self, task_id: int) -> Optional[TaskRecord]:
+        task = self.tasks.get(task_id)
+        was_pending = task is not None and not task.completed
+        task = super().complete_task(task_id)
+        if was_pending:
+            self._append({"op": "complete", "id": task_id})
+        return task
+
+    # Log handling
+    def _append(self, entry: Dict[str, Any]):
+        self._buffer.append(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._appended += 1
+
+    def _write(self, lines: List[str], appended: int):
+        # Runs on the writer thread
+        self._file.write("".join(lines))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._durable = max(self._durable, appended)
+
+    def _submit(self) -> "Future[None]":
+        """Hand the buffered lines to the writer thread"""
+        lines, self._buffer = self._buffer, []
+        return self._writer.submit(self._write, lines, self._appended)
+
+    async def sync(self):
+        """Wait until every write made so far is on disk
+
+        Concurrent callers share flushes, so one fsync commits a whole group.
+        """
+        target = self._appended
+        while self._durable < target:
+            if self._flushing is None:
+                self._flushing = asyncio.ensure_future(self._flush_group())
+            # A cancelled writer must not cancel the flush others wait on
+            await asyncio.shield(self._flushing)
+
+    async def _flush_group(self):
+        try:
+            await asyncio.wrap_future(self._submit())
+        finally:
+            self._flushing = None
+
+    def flush(self):
+        """Write all buffered log lines and fsync them, blocking until done"""
+        self._submit().result()
+
+    def close(self):
+        """Flush pending writes, compact the log and close it"""
+        self.compact()
+        self._file.close()
+        self._writer.shutdown()
+
+    def recover(self) -> int:
+        """Replay the log into memory and return the number of entries applied
+
+        A torn last line (crash in the middle of a write) is discarded and
+        truncated away so new entries start on a clean line.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        check_consistency, self.check_consistency = self.check_consistency, False
+        applied = 0
+        good_offset = 0
+        with open(self.path, "rb") as log:
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(entry)
+                good_offset += len(line)
+                applied += 1
+        if good_offset < os.path.getsize(self.path):
+            with open(self.path, "r+b") as log:
+                log.truncate(good_offset)
+        self.check_consistency = check_consistency
+        if check_consistency:
+            self.verify_counters()
+        return applied
+
+    def _apply(self, entry: Dict[str, Any]):
+        # Records in the log were validated when written, so skip validation
+        if entry["op"] == "users":
+            for record in entry["records"]:
+                self._insert_user(UserRecord(**record))
+                self.user_counter = max(self.user_counter, record["id"] + 1)
+        elif entry["op"] == "tasks":
+            for record in entry["records"]:
+                self._insert_task(TaskRecord(**record))
+                self.task_counter = max(self.task_counter, record["id"] + 1)
+        elif entry["op"] == "complete":
+            InMemoryStore.complete_task(self, entry["id"])
+
+    def compact(self, batch_size: int = 10000):
+        """Rewrite the log as a snapshot of the current records
+
+        Folds completions into the task records so the next startup replays
+        one line per batch of records instead of the full write history.
+        """
+        self.flush()
+        snapshot_path = self.path + ".tmp"
+        with open(snapshot_path, "w", encoding="utf-8") as snapshot:
+            for op, batches in (("users", self.iter_users(batch_size)), ("tasks", self.iter_tasks(batch_size=batch_size))):
+                for batch in batches:
+                    entry = {"op": op, "records": [record.to_dict() for record in batch]}
+                    snapshot.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        self._file.close()
+        os.replace(snapshot_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+
+class _Column:
+    """Growable NumPy column with amortized O(1) appends"""
+
+    def __init__(self, dtype, capacity: int = 1024):
+        self._data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        count = len(values)
+        if self.size + count > len(self._data):
+            grown = np.zeros(max(2 * len(self._data), self.size + count), dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:self.size + count] = values
+        self.size += count
+
+    @property
+    def values(self):
+        """View of the filled part of the column"""
+        return self._data[:self.size]
+
+
+class ColumnarStore(InMemoryStore):
+    """In-memory store keeping tasks in NumPy columns
+
+    Users are stored like InMemoryStore. Tasks live in parallel columns (id,
+    completed flag, created_at as naive epoch seconds, plus lists of the
+    interned strings), indexed by position: ids are allocated sequentially
+    and tasks are never deleted, so task id N sits at position N - 1. Status
+    filters and the per-hour/day breakdown run as vectorized operations, and
+    a TaskRecord is only built for tasks that are actually returned.
+    """
+
+    def __init__(self, check_consistency: bool = STORE_CONSISTENCY_CHECK):
+        if np is None:
+            raise RuntimeError("The columnar storage backend requires numpy (pip install numpy)")
+        super().__init__(check_consistency=check_consistency)
+        self.task_ids = _Column(np.int64)
+        self.task_completed = _Column(np.bool_)
+        self.task_created = _Column(np.float64)
+        self.task_titles: List[str] = []
+        self.task_descriptions: List[str] = []
+        self.task_created_at: List[str] = []
+
+    def _record(self, position: int) -> TaskRecord:
+        return TaskRecord(
+            position + 1,
+            self.task_titles[position],
+            self.task_descriptions[position],
+            bool(self.task_completed.values[position]),
+            self.task_created_at[position],
+        )
+
+    def list_tasks(
+        self,
+        completed: Optional[bool] = None,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[TaskRecord]:
+        """Return tasks in creation order, optionally filtered by completion status"""
+        # Position of id cursor + 1, clamped so huge cursors never reach NumPy
+        start = min(cursor, self.task_ids.size) if cursor is not None else 0
+        if completed is None:
+            stop = self.task_ids.size if limit is None else min(self.task_ids.size, start + limit)
+            positions = range(start, stop)
+        else:
+            positions = self._positions_with_status(completed, start, limit)
+        return [self._record(position) for position in positions]
+
+    def _positions_with_status(self, completed: bool, start: int, limit: Optional[int]) -> List[int]:
+        """Positions from start on whose completed flag matches, at most limit of them
+
+        Scans in growing chunks so a small page does not compare the whole column.
+        """
+        column = self.task_completed.values
+        if limit is None:
+            return (np.flatnonzero(column[start:] == completed) + start).tolist()
+        positions: List[int] = []
+        chunk = max(4096, 4 * limit)
+        while start < column.size and len(positions) < limit:
+            matches = np.flatnonzero(column[start:start + chunk] == completed) + start
+            positions.extend(matches[:limit - len(positions)].tolist())
+            start += chunk
+            chunk *= 2
+        return positions
+
+    def get_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Return a task by id, or None if it does not exist"""
+        if 1 <= task_id <= self.task_ids.size:
+            return self._record(task_id - 1)
+        return None
+
+    def create_task(self, title: str, description: str) -> TaskRecord:
+        """Store a new pending task and return it"""
+        return self.create_tasks([TaskCreate(title=title, description=description)])[0]
+
+    def create_tasks(self, tasks: List[TaskCreate]) -> List[TaskRecord]:
+        """Store a batch of pending tasks under one contiguous block of ids"""
+        now = datetime.datetime.now()
+        created_at = now.isoformat()
+        first_id = self.task_counter
+        self.task_counter += len(tasks)
+        self.task_ids.extend(np.arange(first_id, self.task_counter, dtype=np.int64))
+        self.task_completed.extend(np.zeros(len(tasks), dtype=np.bool_))
+        self.task_created.extend(np.full(len(tasks), (now - EPOCH).total_seconds()))
+        self.task_titles.extend(sys.intern(task.title) for task in tasks)
+        self.task_descriptions.extend(sys.intern(task.description) for task in tasks)
+        self.task_created_at.extend([created_at] * len(tasks))
+        self.collection_versions["tasks"] += 1
+        self._after_write()
+        return [self._record(position) for position in range(first_id - 1, self.task_counter - 1)]
+
+    def complete_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Mark a task as completed, returning None if it does not exist"""
+        if not 1 <= task_id <= self.task_ids.size:
+            return None
+        if not self.task_completed.values[task_id - 1]:
+            self.task_completed.values[task_id - 1] = True
+            self.completed_count += 1
+            self.collection_versions["tasks"] += 1
+            self._after_write()
+        return self._record(task_id - 1)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the aggregate counters in O(1)"""
+        total_tasks = self.task_ids.size
+        return {
+            "total_users": len(self.users),
+            "total_tasks": total_tasks,
+            "completed_tasks": self.completed_count,
+            "pending_tasks": total_tasks - self.completed_count,
+        }
+
+    def task_breakdown(
+        self,
+        bucket: str = "hour",
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+    ) -> Dict[str, Any]:
+        """Count tasks created, and how many of them are completed, per hour or day"""
+        _, width = BREAKDOWN_BUCKETS[bucket]
+        created = self.task_created.values
+        completed = self.task_completed.values
+        mask = np.ones(created.size, dtype=np.bool_)
+        if since is not None:
+            mask &= created >= (_naive(since) - EPOCH).total_seconds()
+        if until is not None:
+            mask &= created < (_naive(until) - EPOCH).total_seconds()
+        buckets = (created[mask] // width).astype(np.int64)
+        first = int(buckets.min()) if buckets.size else 0
+        # Counting sort over the bucket range; timestamps span few distinct hours/days
+        created_counts = np.bincount(buckets - first)
+        completed_counts = np.bincount(buckets - first, weights=completed[mask])
+        label_format = "%Y-%m-%dT%H:00" if bucket == "hour" else "%Y-%m-%d"
+        rows = (
+            ((EPOCH + datetime.timedelta(seconds=(first + int(offset)) * width)).strftime(label_format),
+             int(created_counts[offset]), int(completed_counts[offset]))
+            for offset in np.flatnonzero(created_counts)
+        )
+        return _breakdown_result(bucket, since, until, rows)
+
+    def verify_counters(self):
+        """Recompute counters from the columns and raise if they drifted"""
+        completed = int(np.count_nonzero(self.task_completed.values))
+        if completed != self.completed_count or self.task_ids.size != self.task_counter - 1:
+            raise RuntimeError(
+                f"Store counters out of sync: {self.completed_count} completed of {self.task_ids.size} "
+                f"!= {completed} completed of {self.task_counter - 1}"
+            )
+        self._verify_user_index()
+
+
+class SQLiteStore:
+    """Storage backed by a SQLite database file shared between processes
+
+    Every worker process opens its own connection to the same file. Writes
+    run in BEGIN IMMEDIATE transactions, which take the database write lock,
+    so id allocation (including contiguous blocks for bulk inserts) and the
+    aggregate counters stay correct under concurrent workers. The database
+    runs in WAL journal mode so readers never block the writer.
+    """
+
+    multiprocess_safe = True
+    # Largest id SQLite can store (signed 64-bit INTEGER)
+    MAX_ID = 2**63 - 1
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            name_folded TEXT NOT NULL,
+            email TEXT NOT NULL,
+            age INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (completed, id);
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO counters (name, value) VALUES
+            ('total_users', 0), ('total_tasks', 0), ('completed_tasks', 0),
+            ('users_version', 0), ('tasks_version', 0), ('instance_id', abs(random()));
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_STORAGE_PATHS["sqlite"],
+        busy_timeout_ms: int = 5000,
+        check_consistency: bool = STORE_CONSISTENCY_CHECK,
+    ):
+        self.path = path
+        self.check_consistency = check_consistency
+        # Autocommit mode; write transactions are opened explicitly
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        with self._write():
+            for statement in self.SCHEMA.split(";"):
+                if statement.strip():
+                    self.conn.execute(statement)
+        # Shared by every worker, so ETags built from it agree across processes
+        self.instance_id = format(self._counter("instance_id"), "x")
+
+    @contextmanager
+    def _write(self):
+        """Run statements in one transaction holding the database write lock"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _next_id(self, table: str) -> int:
+        row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        return (row[0] if row else 0) + 1
+
+    def _counter(self, name: str) -> int:
+        return self.conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()[0]
+
+    def _bump(self, **deltas: int):
+        self.conn.executemany(
+            "UPDATE counters SET value = value + ? WHERE name = ?",
+            [(delta, name) for name, delta in deltas.items()],
+        )
+
+    @staticmethod
+    def _user(row) -> UserRecord:
+        return UserRecord(*row)
+
+    @staticmethod
+    def _task(row) -> TaskRecord:
+        return TaskRecord(row[0], row[1], row[2], bool(row[3]), row[4])
+
+    @classmethod
+    def _in_range(cls, record_id: int) -> bool:
+        # Larger ints overflow sqlite3 parameters; no such row can exist
+        return -cls.MAX_ID <= record_id <= cls.MAX_ID
+
+    @classmethod
+    def _cursor(cls, cursor: Optional[int]) -> int:
+        return min(max(cursor or 0, -cls.MAX_ID), cls.MAX_ID)
+
+    # Users
+    def list_users(
+        self,
+        name_contains: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[UserRecord]:
+        """Return users in creation order, optionally filtered by a name substring"""
+        query = "SELECT id, name, email, age FROM users WHERE id > ?"
+        params: List[Any] = [self._cursor(cursor)]
+        if name_contains is not None:
+            query += " AND instr(name_folded, ?) > 0"
+            params.append(name_contains.casefold())
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit if limit is not None else -1)
+        return [self._user(row) for row in self.conn.execute(query, params)]
+
+    def iter_users(self, batch_size: int = 1000) -> Iterator[List[UserRecord]]:
+        """Yield all users in creation order in batches"""
+        return _batches(lambda cursor, limit: self.list_users(cursor=cursor, limit=limit), batch_size)
+
+    def get_user(self, user_id: int) -> Optional[UserRecord]:
+        """Return a user by id, or None if it does not exist"""
+        if not self._in_range(user_id):
+            return None
+        row = self.conn.execute("SELECT id, name, email, age FROM users WHERE id = ?", (user_id,)).fetchone()
+        return self._user(row) if row else None
+
+    def create_user(self, name: str, email: str, age: int) -> UserRecord:
+        """Store a new user and return it"""
+        return self.create_users([UserCreate(name=name, email=email, age=age)])[0]
+
+    def create_users(self, users: List[UserCreate]) -> List[UserRecord]:
+        """Store a batch of users under one contiguous block of ids"""
+        with self._write():
+            first_id = self._next_id("users")
+            created = [UserRecord(first_id + offset, user.name, user.email, user.age) for offset, user in enumerate(users)]
+            self.conn.executemany(
+                "INSERT INTO users (id, name, name_folded, email, age) VALUES (?, ?, ?, ?, ?)",
+                [(u.id, u.name, u.name.casefold(), u.email, u.age) for u in created],
+            )
+            self._bump(total_users=len(created), users_version=1)
+        self._after_write()
+        return created
+
+    # Tasks
+    def list_tasks(
+        self,
+        completed: Optional[bool] = None,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[TaskRecord]:
+        """Return tasks in creation order, optionally filtered by completion status"""
+        query = "SELECT id, title, description, completed, created_at FROM tasks WHERE id > ?"
+        params: List[Any] = [self._cursor(cursor)]
+        if completed is not None:
+            query += " AND completed = ?"
+            params.append(int(completed))
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit if limit is not None else -1)
+        return [self._task(row) for row in self.conn.execute(query, params)]
+
+    def iter_tasks(self, completed: Optional[bool] = None, batch_size: int = 1000) -> Iterator[List[TaskRecord]]:
+        """Yield tasks in creation order in batches"""
+        return _batches(
+            lambda cursor, limit: self.list_tasks(completed=completed, cursor=cursor, limit=limit),
+            batch_size,
+        )
+
+    def get_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Return a task by id, or None if it does not exist"""
+        if not self._in_range(task_id):
+            return None
+        row = self.conn.execute(
+            "SELECT id, title, description, completed, created_at FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        return self._task(row) if row else None
+
+    def create_task(self, title: str, description: str) -> TaskRecord:
+        """Store a new pending task and return it"""
+        return self.create_tasks([TaskCreate(title=title, description=description)])[0]
+
+    def create_tasks(self, tasks: List[TaskCreate]) -> List[TaskRecord]:
+        """Store a batch of pending tasks under one contiguous block of ids"""
+        created_at = datetime.datetime.now().isoformat()
+        with self._write():
+            first_id = self._next_id("tasks")
+            created = [
+                TaskRecord(first_id + offset, task.title, task.description, False, created_at)
+                for offset, task in enumerate(tasks)
+            ]
+            self.conn.executemany(
+                "INSERT INTO tasks (id, title, description, completed, created_at) VALUES (?, ?, ?, 0, ?)",
+                [(t.id, t.title, t.description, t.created_at) for t in created],
+            )
+            self._bump(total_tasks=len(created), tasks_version=1)
+        self._after_write()
+        return created
+
+    def complete_task(self, task_id: int) -> Optional[TaskRecord]:
+        """Mark a task as completed, returning None if it does not exist"""
+        if not self._in_range(task_id):
+            return None
+        with self._write():
+            updated = self.conn.execute(
+                "UPDATE tasks SET completed = 1 WHERE id = ? AND completed = 0", (task_id,)
+            ).rowcount
+            if updated:
+                self._bump(completed_tasks=1, tasks_version=1)
+        if updated:
+            self._after_write()
+        return self.get_task(task_id)
+
+    # Statistics
+    def versions(self) -> Dict[str, int]:
+        """Return the current version number of each collection, shared by all workers"""
+        rows = self.conn.execute(
+            "SELECT name, value FROM counters WHERE name IN ('users_version', 'tasks_version')"
+        )
+        versions = dict(rows)
+        return {"users": versions["users_version"], "tasks": versions["tasks_version"]}
+
+    def stats(self) -> Dict[str, int]:
+        """Return the aggregate counters in O(1)"""
+        counters = dict(self.conn.execute("SELECT name, value FROM counters"))
+        return {
+            "total_users": counters["total_users"],
+            "total_tasks": counters["total_tasks"],
+            "completed_tasks": counters["completed_tasks"],
+            "pending_tasks": counters["total_tasks"] - counters["completed_tasks"],
+        }
+
+    def task_breakdown(
+        self,
+        bucket: str = "hour",
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+    ) -> Dict[str, Any]:
+        """Count tasks created, and how many of them are completed, per hour or day"""
+        prefix_length, _ = BREAKDOWN_BUCKETS[bucket]
+        query = "SELECT substr(created_at, 1, ?) AS prefix, COUNT(*), SUM(completed) FROM tasks WHERE 1"
+        params: List[Any] = [prefix_length]
+        if since is not None:
+            query += " AND created_at >= ?"
+            params.append(_naive(since).isoformat())
+        if until is not None:
+            query += " AND created_at < ?"
+            params.append(_naive(until).isoformat())
+        rows = self.conn.execute(query + " GROUP BY prefix ORDER BY prefix", params)
+        return _breakdown_result(bucket, since, until, ((_bucket_label(p, bucket), n, c) for p, n, c in rows))
+
+    def verify_counters(self):
+        """Recompute the counters from the tables and raise if they drifted"""
+        total_users = self.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        total_tasks, completed = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(completed), 0) FROM tasks"
+        ).fetchone()
+        expected = {
+            "total_users": total_users,
+            "total_tasks": total_tasks,
+            "completed_tasks": completed,
+            "pending_tasks": total_tasks - completed,
+        }
+        actual = self.stats()
+        if actual != expected:
+            raise RuntimeError(f"Store counters out of sync: {actual} != {expected}")
+
+    def _after_write(self):
+        if self.check_consistency:
+            self.verify_counters()
+
+    # Lifecycle
+    async def sync(self):
+        """Writes are committed per transaction, so there is nothing to wait for"""
+
+    def flush(self):
+        """Writes are committed per transaction, so there is nothing to flush"""
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
+def create_store(backend: str = STORAGE_BACKEND, path: Optional[str] = STORAGE_PATH):
+    """Build the storage backend selected by name"""
+    if backend == "memory":
+        return InMemoryStore()
+    if backend == "wal":
+        return WALStore(path or DEFAULT_STORAGE_PATHS["wal"])
+    if backend == "sqlite":
+        return SQLiteStore(path or DEFAULT_STORAGE_PATHS["sqlite"])
+    if backend == "columnar":
+        return ColumnarStore()
+    raise ValueError(f"Unknown storage backend '{backend}'")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Checks of ApiClient's read coalescing and caching that need no running server
+The app is called in process through the ASGI transport.
+Runs under pytest or directly: python test_api_client.py
+"""
+import asyncio
+from api_client import ApiClient
+from app import app
+
+
+def make_client(**options):
+    """An in-process client whose upstream requests are recorded and can be held back"""
+    client = ApiClient(transport="inprocess", app=app, **options)
+    client.sent = []  # (method, endpoint, status) per upstream request
+    client.gate = asyncio.Event()
+    client.gate.set()
+    send = client._asgi.request
+
+    async def recording_request(method, endpoint, body, params, headers=None):
+        if method == "GET":
+            await client.gate.wait()
+        status, content, etag = await send(method, endpoint, body, params, headers)
+        client.sent.append((method, endpoint, status))
+        return status, content, etag
+
+    client._asgi.request = recording_request
+    return client
+
+
+async def settle():
+    # Let every started task run up to its next real suspension point
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_reads_share_one_request():
+    """N identical concurrent reads cause one upstream request and all get its result"""
+
+    async def run():
+        client = make_client(cache_size=0)
+        try:
+            results = await asyncio.gather(*(client.request("GET", "/users") for _ in range(10)))
+            assert all(result == results[0] for result in results)
+            assert client.sent == [("GET", "/users", 200)]
+            assert (client.upstream_reads, client.coalesced_reads) == (1, 9)
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_read_after_write_does_not_join_earlier_flight():
+    """A read issued after a write starts its own request and sees the write"""
+
+    async def run():
+        client = make_client()
+        try:
+            client.gate.clear()
+            before = asyncio.ensure_future(client.request("GET", "/users"))
+            await settle()
+            created = await client.request("POST", "/users", params={"name": "Grace", "email": "grace@example.com", "age": 45})
+            after = asyncio.ensure_future(client.request("GET", "/users"))
+            await settle()
+            assert client.upstream_reads == 2 and client.coalesced_reads == 0
+            client.gate.set()
+            await before
+            assert created["id"] in [user["id"] for user in await after]
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_read_racing_write_is_cached_stale():
+    """A response requested before a write is cached already stale"""
+
+    async def run():
+        client = make_client()
+        try:
+            client.gate.clear()
+            before = asyncio.ensure_future(client.request("GET", "/users"))
+            await settle()
+            await client.request("POST", "/users", params={"name": "Alan", "email": "alan@example.com", "age": 41})
+            client.gate.set()
+            await before
+            # Not served from the cache: the next read goes upstream again
+            await client.request("GET", "/users")
+            assert client.upstream_reads == 2
+            assert [status for method, _, status in client.sent if method == "GET"] == [200, 304]
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_cancel_shared_fetch():
+    """Cancelling one waiter leaves the shared request running for the others"""
+
+    async def run():
+        client = make_client(cache_size=0)
+        try:
+            client.gate.clear()
+            first = asyncio.ensure_future(client.request("GET", "/tasks"))
+            second = asyncio.ensure_future(client.request("GET", "/tasks"))
+            await settle()
+            first.cancel()
+            await settle()
+            client.gate.set()
+            assert isinstance(await second, list)
+            assert first.cancelled()
+            assert client.sent == [("GET", "/tasks", 200)]
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_stale_entry_revalidated_with_304():
+    """A stale entry is revalidated by ETag and its cached body served on 304"""
+
+    async def run():
+        client = make_client(cache_ttl=0)  # every read revalidates
+        try:
+            first = await client.request("GET", "/stats")
+            second = await client.request("GET", "/stats")
+            assert second == first
+            assert [status for _, _, status in client.sent] == [200, 304]
+            assert client.cache.revalidations == 1
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+def main():
+    print("🧪 Testing the API client")
+    print("=" * 50)
+    failed = 0
+    tests = (
+        test_concurrent_reads_share_one_request,
+        test_read_after_write_does_not_join_earlier_flight,
+        test_read_racing_write_is_cached_stale,
+        test_cancelled_caller_does_not_cancel_shared_fetch,
+        test_stale_entry_revalidated_with_304,
+    )
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    if failed:
+        raise SystemExit(f"\n❌ {failed} check(s) failed")
+    print("\n🎉 All API client checks passed!")
+
+
+if __name__ == "__main__":
+    main()
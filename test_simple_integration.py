@@ -91,5 +91,10 @@ async def main():
     print("Your FastAPI + Simple MCP integration is working correctly.")
     print("You can now run the simplified Gemini integration demo.")
 
+async def run_tests():
+    """Run all tests and release the pooled HTTP client"""
+    async with mcp_server:
+        await main()
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run_tests())
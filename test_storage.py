@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Checks of the storage backends that need no running server
+Runs under pytest or directly: python test_storage.py
+"""
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from storage import InMemoryStore, SQLiteStore, WALStore, np
+from models import UserCreate, TaskCreate
+
+
+def make_stores(tmp_path):
+    """Every backend, with the consistency check enabled"""
+    stores = {
+        "memory": InMemoryStore(check_consistency=True),
+        "wal": WALStore(os.path.join(str(tmp_path), "check.wal"), check_consistency=True),
+        "sqlite": SQLiteStore(os.path.join(str(tmp_path), "check.db"), check_consistency=True),
+    }
+    if np is not None:
+        from storage import ColumnarStore
+        stores["columnar"] = ColumnarStore(check_consistency=True)
+    return stores
+
+
+def test_consistency_check(tmp_path):
+    """STORE_CONSISTENCY_CHECK verifies counters and indexes after every kind of write"""
+    for name, store in make_stores(tmp_path).items():
+        store.create_user("Ada", "ada@example.com", 36)
+        store.create_users([UserCreate(name=f"User {i}", email=f"user{i}@example.com", age=30) for i in range(5)])
+        store.create_task("Write", "Write the report")
+        created = store.create_tasks([TaskCreate(title=f"Task {i}", description="Bulk") for i in range(10)])
+        for task in created[::3]:
+            store.complete_task(task.id)
+        store.complete_task(created[0].id)  # completing twice changes nothing
+        assert store.stats() == {"total_users": 6, "total_tasks": 11, "completed_tasks": 4, "pending_tasks": 7}, name
+        assert [t.id for t in store.list_tasks(completed=False, cursor=created[1].id, limit=3)] == [4, 6, 7], name
+        store.close()
+
+    # Drift is reported, not silently served
+    store = InMemoryStore(check_consistency=True)
+    store.create_task("Write", "Write the report")
+    store.completed_count += 1
+    try:
+        store.create_task("Review", "Review the report")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("counter drift went unnoticed")
+
+
+def test_out_of_range_ids(tmp_path):
+    """Ids and cursors too large for SQLite or NumPy are missing, not errors"""
+    huge = 10**20
+    for name, store in make_stores(tmp_path).items():
+        store.create_user("Ada", "ada@example.com", 36)
+        store.create_task("Write", "Write the report")
+        assert store.get_user(huge) is None and store.get_task(huge) is None, name
+        assert store.complete_task(huge) is None, name
+        assert store.list_users(cursor=huge) == [], name
+        for completed in (None, True, False):
+            assert store.list_tasks(completed=completed, cursor=huge, limit=10) == [], name
+        store.close()
+
+
+def fill_wal(path):
+    """Write users, tasks and completions to a WAL store and return its stats"""
+    store = WALStore(path, check_consistency=True)
+    store.create_users([UserCreate(name=f"User {i}", email=f"user{i}@example.com", age=30) for i in range(3)])
+    store.create_tasks([TaskCreate(title=f"Task {i}", description="Bulk") for i in range(4)])
+    store.complete_task(2)
+    store.flush()
+    stats = store.stats()
+    # Leave without close(), as a crash would, so the log is not compacted
+    store._file.close()
+    return stats
+
+
+def test_wal_replays_after_torn_line(tmp_path):
+    """A half-written last line is dropped and truncated away; earlier writes survive"""
+    path = os.path.join(str(tmp_path), "torn.wal")
+    stats = fill_wal(path)
+    with open(path, "a", encoding="utf-8") as log:
+        log.write('{"op":"tasks","records":[{"id":5,"title":"Torn"')
+    store = WALStore(path, check_consistency=True)
+    assert store.recovered_entries == 3
+    assert store.stats() == stats
+    assert store.get_task(2).completed and store.get_task(5) is None
+    # New writes start on a clean line and replay too
+    store.create_task("After", "Written after the crash")
+    store.flush()
+    store._file.close()
+    store = WALStore(path, check_consistency=True)
+    assert store.recovered_entries == 4 and store.get_task(5).title == "After"
+    store.close()
+
+
+def test_wal_replays_after_compaction(tmp_path):
+    """compact() folds the history into a snapshot that replays to the same state"""
+    path = os.path.join(str(tmp_path), "compact.wal")
+    stats = fill_wal(path)
+    store = WALStore(path, check_consistency=True)
+    store.close()  # compacts
+    store = WALStore(path, check_consistency=True)
+    assert store.recovered_entries == 2  # one batch of users, one of tasks
+    assert store.stats() == stats
+    assert [t.id for t in store.list_tasks(completed=True)] == [2]
+    assert store.create_task("Next", "Ids continue after the snapshot").id == 5
+    store.close()
+
+
+def test_wal_acknowledged_writes_are_durable(tmp_path):
+    """Once sync() returns, concurrent writes are in the log without any flush()"""
+    path = os.path.join(str(tmp_path), "sync.wal")
+    store = WALStore(path, check_consistency=True)
+    flushes = 0
+    submit = store._submit
+
+    def counting_submit():
+        nonlocal flushes
+        flushes += 1
+        return submit()
+
+    store._submit = counting_submit
+
+    async def write(i):
+        store.create_task(f"Task {i}", "Acknowledged")
+        await store.sync()
+
+    async def write_all():
+        await asyncio.gather(*(write(i) for i in range(50)))
+
+    asyncio.run(write_all())
+    assert flushes < 50  # writers shared fsyncs
+    # Read the log as a restart after a crash would, without closing the store
+    recovered = WALStore(path, check_consistency=True)
+    assert recovered.stats()["total_tasks"] == 50
+    recovered.close()
+    store._file.close()
+
+
+def create_tasks_in_worker(path, count):
+    store = SQLiteStore(path)
+    for i in range(count):
+        store.create_task(f"Task {os.getpid()}-{i}", "Created by a worker process")
+    store.create_tasks([TaskCreate(title="Bulk", description="Created by a worker process")] * count)
+    store.close()
+
+
+def test_sqlite_ids_across_processes(tmp_path):
+    """Worker processes sharing one SQLite file never hand out the same id"""
+    path = os.path.join(str(tmp_path), "shared.db")
+    SQLiteStore(path).close()  # create the schema once
+    workers = [multiprocessing.Process(target=create_tasks_in_worker, args=(path, 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+    store = SQLiteStore(path, check_consistency=True)
+    ids = [task.id for task in store.list_tasks()]
+    assert len(ids) == len(set(ids)) == 400
+    assert store.stats()["total_tasks"] == 400
+    store.verify_counters()
+    store.close()
+
+
+def main():
+    print("🧪 Testing the storage backends")
+    print("=" * 50)
+    failed = 0
+    tests = (
+        test_consistency_check,
+        test_out_of_range_ids,
+        test_wal_replays_after_torn_line,
+        test_wal_replays_after_compaction,
+        test_wal_acknowledged_writes_are_durable,
+        test_sqlite_ids_across_processes,
+    )
+    for test in tests:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            try:
+                test(tmp_path)
+                print(f"✅ {test.__name__}")
+            except Exception as e:
+                failed += 1
+                print(f"❌ {test.__name__}: {e!r}")
+    if failed:
+        raise SystemExit(f"\n❌ {failed} check(s) failed")
+    print("\n🎉 All storage checks passed!")
+
+
+if __name__ == "__main__":
+    main()
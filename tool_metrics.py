@@ -0,0 +1,190 @@
+"""
+Per-tool instrumentation for the MCP servers
+Every tool generated by tool_registry is wrapped with instrument(), which
+records call latency histograms, error counts and how the time splits
+between upstream requests to the app and local work (caching, filtering,
+serialization). ApiClient reports each upstream request to the tool call
+in progress through a context variable, together with the bytes sent and
+received. The get_server_metrics tool returns a snapshot, and setting
+TOOL_METRICS_FILE appends one to that file every TOOL_METRICS_INTERVAL
+seconds as a JSON line.
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from metrics import LATENCY_BUCKETS, SIZE_BUCKETS, Histogram
+
+# Periodic dump of the metrics snapshot (disabled when no file is set)
+TOOL_METRICS_FILE = os.getenv("TOOL_METRICS_FILE")
+TOOL_METRICS_INTERVAL = float(os.getenv("TOOL_METRICS_INTERVAL", "60"))
+
+
+class ToolCall:
+    """Upstream work done on behalf of one tool call"""
+
+    __slots__ = ("upstream_seconds", "upstream_requests", "request_bytes", "response_bytes")
+
+    def __init__(self):
+        self.upstream_seconds = 0.0
+        self.upstream_requests = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+# The tool call in progress; requests made by a coalesced read are charged
+# to the call that started it
+current_call: "contextvars.ContextVar[Optional[ToolCall]]" = contextvars.ContextVar("current_tool_call", default=None)
+
+
+def record_upstream(seconds: float, request_bytes: int, response_bytes: int):
+    """Charge one upstream request to the tool call in progress, if any"""
+    call = current_call.get()
+    if call is not None:
+        call.upstream_seconds += seconds
+        call.upstream_requests += 1
+        call.request_bytes += request_bytes
+        call.response_bytes += response_bytes
+
+
+class ToolStats:
+    """Metrics of one tool"""
+
+    __slots__ = ("calls", "errors", "latency", "upstream", "local", "upstream_requests", "request_bytes", "response_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.upstream = Histogram(LATENCY_BUCKETS)
+        self.local = Histogram(LATENCY_BUCKETS)
+        self.upstream_requests = 0
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        def timing(histogram: Histogram) -> Dict[str, Any]:
+            count = histogram.count
+            return {
+                "mean_ms": histogram.sum / count * 1000 if count else None,
+                # Percentiles are bucket upper bounds
+                **{f"p{p}_ms": _ms(histogram.percentile(p / 100)) for p in (50, 95, 99)},
+            }
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.errors / self.calls if self.calls else 0.0,
+            "latency": timing(self.latency),
+            "upstream": timing(self.upstream),
+            "local": timing(self.local),
+            "upstream_requests": self.upstream_requests,
+            "request_bytes_total": int(self.request_bytes.sum),
+            "response_bytes_total": int(self.response_bytes.sum),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else seconds * 1000
+
+
+class ToolMetrics:
+    """Metrics of every tool of the server process"""
+
+    def __init__(self, dump_path: Optional[str] = TOOL_METRICS_FILE, dump_interval: float = TOOL_METRICS_INTERVAL):
+        self.tools: Dict[str, ToolStats] = {}
+        self.started_at = time.time()
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._dumper: Optional["asyncio.Task[None]"] = None
+        self._dumper_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def stats(self, tool: str) -> ToolStats:
+        stats = self.tools.get(tool)
+        if stats is None:
+            stats = self.tools[tool] = ToolStats()
+        return stats
+
+    def record(self, tool: str, seconds: float, call: ToolCall, failed: bool):
+        stats = self.stats(tool)
+        stats.calls += 1
+        stats.errors += failed
+        stats.latency.observe(seconds)
+        # Calls served locally (cache hits) do not skew the upstream timings
+        if call.upstream_requests:
+            stats.upstream.observe(call.upstream_seconds)
+        stats.local.observe(max(0.0, seconds - call.upstream_seconds))
+        stats.upstream_requests += call.upstream_requests
+        stats.request_bytes.observe(call.request_bytes)
+        stats.response_bytes.observe(call.response_bytes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "timestamp": time.time(),
+            "uptime_seconds": time.time() - self.started_at,
+            "tools": {name: stats.snapshot() for name, stats in sorted(self.tools.items())},
+        }
+
+    def dump(self):
+        """Append the current snapshot to dump_path as one JSON line"""
+        if self.dump_path:
+            with open(self.dump_path, "a", encoding="utf-8") as dump_file:
+                dump_file.write(json.dumps(self.snapshot(), separators=(",", ":")) + "\n")
+
+    async def _dump_periodically(self):
+        while True:
+            await asyncio.sleep(self.dump_interval)
+            self.dump()
+
+    def ensure_dumper(self):
+        """Start the periodic dump on the running loop, once per loop"""
+        if not self.dump_path:
+            return
+        loop = asyncio.get_running_loop()
+        if self._dumper_loop is not loop or self._dumper is None or self._dumper.done():
+            self._dumper = loop.create_task(self._dump_periodically())
+            self._dumper_loop = loop
+
+    def stop_dumper(self):
+        """Stop the periodic dump and write a final snapshot"""
+        if self._dumper is not None:
+            self._dumper.cancel()
+            self._dumper = None
+            self._dumper_loop = None
+        self.dump()
+
+
+# Shared by every tool of the process
+tool_metrics = ToolMetrics()
+
+
+def _is_error_response(result: Any) -> bool:
+    # The app reports failures as {"detail": ...}
+    return isinstance(result, dict) and "detail" in result
+
+
+def instrument(name: str, metrics: ToolMetrics = tool_metrics) -> Callable:
+    """Decorator recording the latency, upstream time, payload sizes and errors of a tool"""
+
+    def decorator(tool: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(tool)
+        async def instrumented(*args, **kwargs):
+            metrics.ensure_dumper()
+            call = ToolCall()
+            token = current_call.set(call)
+            failed = True
+            start = time.perf_counter()
+            try:
+                result = await tool(*args, **kwargs)
+                failed = _is_error_response(result)
+                return result
+            finally:
+                current_call.reset(token)
+                metrics.record(name, time.perf_counter() - start, call, failed)
+
+        return instrumented
+
+    return decorator
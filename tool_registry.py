@@ -0,0 +1,175 @@
+"""
+Declarative registry of the MCP tools
+Every tool is described once (name, HTTP method, path template, parameter
+mapping) and both the FastMCP servers and SimpleMCPServer are generated
+from it, so they expose the same tools with the same request semantics and
+share every client-side feature of api_client.ApiClient.
+"""
+import inspect
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from pydantic import Field
+from api_client import ApiClient
+from tool_metrics import instrument, tool_metrics
+from tracing import traced
+import profiler
+
+
+class Param(NamedTuple):
+    """A tool argument and where it goes in the HTTP request"""
+    name: str
+    annotation: Any
+    default: Any = inspect.Parameter.empty
+    location: str = "query"  # "path", "query" or "body"
+    field: Optional[str] = None  # API name when it differs from the tool argument
+
+
+class ToolSpec(NamedTuple):
+    """Declarative description of one MCP tool"""
+    name: str
+    description: str
+    method: str = "GET"
+    path: str = ""  # may contain {placeholders} filled from path params
+    params: Tuple[Param, ...] = ()
+    returns: Any = Dict[str, Any]
+    fixed_query: Dict[str, Any] = {}  # query parameters sent on every call
+    transform: Optional[Callable[[Any, Dict[str, Any]], Any]] = None  # post-process (result, arguments)
+    handler: Optional[Callable[[ApiClient, Dict[str, Any]], Any]] = None  # local tool, no HTTP request
+
+
+def make_page(items: Any, limit: int) -> Any:
+    """Wrap a page of records with the cursor for the next page"""
+    if not isinstance(items, list):
+        return items  # error response from the app
+    next_cursor = items[-1]["id"] if len(items) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def profile_tool(seconds: float, interval_ms: float) -> Dict[str, Any]:
+    """Profile the MCP server process, reporting errors like the app does"""
+    if not profiler.PROFILING_ENABLED:
+        return {"detail": "Profiling is disabled, set PROFILING_ENABLED=true"}
+    if not 0 < seconds <= profiler.PROFILE_MAX_SECONDS or not 1 <= interval_ms <= 1000:
+        return {"detail": f"seconds must be in (0, {profiler.PROFILE_MAX_SECONDS}] and interval_ms in [1, 1000]"}
+    try:
+        profile = await profiler.profile(seconds, interval_ms, "mcp")
+    except profiler.ProfilerBusy as exc:
+        return {"detail": str(exc)}
+    return {"samples": profile.samples, "seconds": profile.seconds, "file": profile.path, "stacks": profile.collapsed()}
+
+
+TOOLS: List[ToolSpec] = [
+    ToolSpec("get_health_status", "Check the health status of the FastAPI application", "GET", "/health"),
+    ToolSpec("get_app_info", "Get information about the FastAPI application", "GET", "/"),
+    ToolSpec("get_all_users", "Get all users from the FastAPI application", "GET", "/users",
+             returns=List[Dict[str, Any]]),
+    ToolSpec("create_user", "Create a new user in the FastAPI application", "POST", "/users",
+             params=(Param("name", str), Param("email", str), Param("age", int))),
+    ToolSpec("get_user_by_id", "Get a specific user by ID from the FastAPI application", "GET", "/users/{user_id}",
+             params=(Param("user_id", int, location="path"),)),
+    ToolSpec("get_all_tasks", "Get all tasks from the FastAPI application", "GET", "/tasks",
+             returns=List[Dict[str, Any]]),
+    ToolSpec("create_task", "Create a new task in the FastAPI application", "POST", "/tasks",
+             params=(Param("title", str), Param("description", str))),
+    ToolSpec("complete_task", "Mark a task as completed in the FastAPI application", "PUT", "/tasks/{task_id}/complete",
+             params=(Param("task_id", int, location="path"),)),
+    ToolSpec("roll_dice",
+             "Roll dice using the FastAPI application; aggregate=True returns sum, mean, variance "
+             "and histogram instead of every result, and a seed (>= 0) makes the rolls reproducible", "GET", "/dice/roll",
+             params=(Param("sides", int, 6), Param("count", int, 1), Param("aggregate", bool, False),
+                     Param("seed", Annotated[Optional[int], Field(ge=0)], None))),
+    ToolSpec("get_app_statistics", "Get application statistics from the FastAPI application", "GET", "/stats"),
+    ToolSpec("get_task_statistics",
+             "Get tasks created and completed per hour or day, with completion rates; "
+             "since/until are ISO timestamps bounding the creation time", "GET", "/stats/tasks",
+             params=(Param("bucket", str, "hour"), Param("since", Optional[str], None),
+                     Param("until", Optional[str], None))),
+    ToolSpec("search_users_by_name", "Search for users by name in the FastAPI application", "GET", "/users",
+             params=(Param("name", str, field="name_contains"),), returns=List[Dict[str, Any]]),
+    ToolSpec("get_pending_tasks", "Get all pending (incomplete) tasks from the FastAPI application", "GET", "/tasks",
+             fixed_query={"completed": False}, returns=List[Dict[str, Any]]),
+    ToolSpec("get_completed_tasks", "Get all completed tasks from the FastAPI application", "GET", "/tasks",
+             fixed_query={"completed": True}, returns=List[Dict[str, Any]]),
+    ToolSpec("get_users_page",
+             "Get one page of users; pass next_cursor back as cursor to get the following page", "GET", "/users",
+             params=(Param("limit", int, 50), Param("cursor", Optional[int], None)),
+             transform=lambda result, args: make_page(result, args["limit"])),
+    ToolSpec("get_tasks_page",
+             "Get one page of tasks, optionally filtered by completion status; "
+             "pass next_cursor back as cursor to get the following page", "GET", "/tasks",
+             params=(Param("limit", int, 50), Param("cursor", Optional[int], None),
+                     Param("completed", Optional[bool], None)),
+             transform=lambda result, args: make_page(result, args["limit"])),
+    ToolSpec("create_users_batch",
+             "Create several users in one request; each item needs name, email and age", "POST", "/users/bulk",
+             params=(Param("users", List[Dict[str, Any]], location="body"),), returns=List[Dict[str, Any]]),
+    ToolSpec("create_tasks_batch",
+             "Create several tasks in one request; each item needs title and description", "POST", "/tasks/bulk",
+             params=(Param("tasks", List[Dict[str, Any]], location="body"),), returns=List[Dict[str, Any]]),
+    ToolSpec("get_cache_stats", "Get hit/miss counters of the MCP server's response cache",
+             handler=lambda client, args: client.cache_stats()),
+    ToolSpec("get_server_metrics",
+             "Get per-tool call counts, error rates, latency percentiles split into upstream "
+             "(HTTP to the app) and local time, and payload sizes of the MCP server",
+             handler=lambda client, args: tool_metrics.snapshot()),
+    ToolSpec("profile_mcp_server",
+             "Sample the stacks of the MCP server for some seconds and return them in the collapsed "
+             "(flamegraph) format; only available when the server runs with PROFILING_ENABLED",
+             params=(Param("seconds", float, 5.0), Param("interval_ms", float, profiler.PROFILE_INTERVAL_MS)),
+             handler=lambda client, args: profile_tool(args["seconds"], args["interval_ms"])),
+]
+
+
+def _query_value(value: Any) -> Any:
+    # aiohttp rejects bools in query strings, FastAPI expects true/false
+    return str(value).lower() if isinstance(value, bool) else value
+
+
+async def call_tool(spec: ToolSpec, client: ApiClient, arguments: Dict[str, Any]) -> Any:
+    """Execute a tool by mapping its arguments onto an API request"""
+    if spec.handler is not None:
+        result = spec.handler(client, arguments)
+        return await result if inspect.isawaitable(result) else result
+    endpoint = spec.path.format(**{p.name: arguments[p.name] for p in spec.params if p.location == "path"})
+    query = {key: _query_value(value) for key, value in spec.fixed_query.items()}
+    body = None
+    for param in spec.params:
+        value = arguments.get(param.name)
+        if param.location == "query" and value is not None:
+            query[param.field or param.name] = _query_value(value)
+        elif param.location == "body":
+            body = value
+    result = await client.request(spec.method, endpoint, body, query or None)
+    if spec.transform is not None:
+        result = spec.transform(result, arguments)
+    return result
+
+
+def make_tool_function(spec: ToolSpec, client: ApiClient) -> Callable[..., Awaitable[Any]]:
+    """Build an async function with the tool's name, docstring and signature
+
+    The signature is what FastMCP inspects to generate the tool's input
+    schema, and what lets SimpleMCPServer callers pass arguments positionally.
+    """
+    signature = inspect.Signature(
+        [
+            inspect.Parameter(p.name, inspect.Parameter.POSITIONAL_OR_KEYWORD, default=p.default, annotation=p.annotation)
+            for p in spec.params
+        ],
+        return_annotation=spec.returns,
+    )
+
+    async def tool(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return await call_tool(spec, client, bound.arguments)
+
+    tool.__name__ = tool.__qualname__ = spec.name
+    tool.__doc__ = spec.description
+    tool.__signature__ = signature
+    tool.__annotations__ = {**{p.name: p.annotation for p in spec.params}, "return": spec.returns}
+    return tool
+
+
+def build_tools(client: ApiClient) -> Dict[str, Callable[..., Awaitable[Any]]]:
+    """Generate every registered tool bound to the given client, instrumented and traced"""
+    return {spec.name: instrument(spec.name)(traced(spec.name)(make_tool_function(spec, client))) for spec in TOOLS}
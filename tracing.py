@@ -0,0 +1,262 @@
+"""
+Optional distributed tracing across the MCP servers and the FastAPI app
+Spans follow the W3C Trace Context format: each MCP tool call opens a
+span, every upstream request from ApiClient opens a child span and sends
+its context in a traceparent header, and TracingMiddleware in the app
+continues the trace with a span per request. Finished spans are appended
+to TRACE_FILE as JSON lines (one file can be shared by both processes),
+from which per-call waterfalls are built offline (python tracing.py FILE
+prints them). Tracing is off unless TRACE_FILE is set; spans are then
+no-ops.
+"""
+import contextvars
+import functools
+import json
+import os
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from metrics import RouteLabeler
+
+TRACE_FILE = os.getenv("TRACE_FILE")
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "service", "start", "attributes", "error", "_started")
+
+    def __init__(self, name: str, service: str, trace_id: str, parent_id: Optional[str]):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.service = service
+        self.start = time.time()
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self, duration: float) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": self.service,
+            "start": self.start,
+            "duration_ms": duration * 1000,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled"""
+
+    def set(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Return (trace_id, parent span_id) from a traceparent header, or None if invalid"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2]
+
+
+class _SpanScope:
+    """Context manager that makes a span current and exports it when done"""
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        current_span.reset(self.token)
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.export(self.span, time.perf_counter() - self.span._started)
+        return False
+
+
+class _NoopScope:
+    def __enter__(self) -> _NoopSpan:
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class Tracer:
+    """Creates spans and appends finished ones to a JSON-lines file"""
+
+    def __init__(self, path: Optional[str] = TRACE_FILE):
+        self.path = path
+        self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def span(self, name: str, service: str, traceparent: Optional[str] = None):
+        """Start a span as a child of the current span, or of a remote traceparent
+
+        Use as a context manager; it yields the span (a no-op when disabled).
+        """
+        if not self.path:
+            return _NOOP_SCOPE
+        remote = parse_traceparent(traceparent)
+        parent = current_span.get()
+        if remote is not None:
+            trace_id, parent_id = remote
+        elif parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+        return _SpanScope(self, Span(name, service, trace_id, parent_id))
+
+    def inject(self, headers: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """Add the traceparent of the current span to outgoing request headers"""
+        span = current_span.get() if self.path else None
+        if span is None:
+            return headers
+        return {**(headers or {}), "traceparent": span.traceparent}
+
+    def export(self, span: Span, duration: float):
+        if self._file is None:
+            # Line buffered, so every span reaches the file as one append
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._file.write(json.dumps(span.to_dict(duration), separators=(",", ":"), default=str) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# Shared by the app and the MCP servers of the process
+tracer = Tracer()
+
+
+def traced(name: str, service: str = "mcp", tracer: Tracer = tracer) -> Callable:
+    """Decorator running each call of an MCP tool in its own span
+
+    Upstream requests made by the tool become child spans.
+    """
+
+    def decorator(tool: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(tool)
+        async def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return await tool(*args, **kwargs)
+            with tracer.span(f"tool {name}", service) as span:
+                span.set("mcp.tool", name)
+                result = await tool(*args, **kwargs)
+                # The app reports failures as {"detail": ...}
+                if isinstance(result, dict) and "detail" in result:
+                    span.error = str(result["detail"])
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware continuing incoming traces with a span per request"""
+
+    def __init__(self, app: Callable, tracer: Tracer = tracer, service: str = "app"):
+        self.app = app
+        self.tracer = tracer
+        self.service = service
+        self._route = RouteLabeler()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        traceparent = next((value.decode() for name, value in scope["headers"] if name == b"traceparent"), None)
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with self.tracer.span(f"{scope['method']} {scope['path']}", self.service, traceparent) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # Name the span after the route template once routing has happened
+                route = self._route(scope)
+                span.name = f"{scope['method']} {route}"
+                span.set("http.method", scope["method"])
+                span.set("http.route", route)
+                span.set("http.target", scope["path"])
+                span.set("http.status_code", status)
+
+
+def print_waterfalls(path: str):
+    """Print every trace of a span file as an indented waterfall"""
+    traces: Dict[str, list] = {}
+    with open(path, encoding="utf-8") as span_file:
+        for line in span_file:
+            span = json.loads(line)
+            traces.setdefault(span["trace_id"], []).append(span)
+    for trace_id, spans in traces.items():
+        ids = {span["span_id"] for span in spans}
+        children: Dict[Optional[str], list] = {}
+        for span in spans:
+            # Spans whose parent is not in the file are shown as roots
+            children.setdefault(span["parent_id"] if span["parent_id"] in ids else None, []).append(span)
+        origin = min(span["start"] for span in spans)
+        print(f"\n🔎 trace {trace_id}")
+
+        def show(parent_id: Optional[str], depth: int):
+            for span in sorted(children.get(parent_id, []), key=lambda span: span["start"]):
+                offset = (span["start"] - origin) * 1000
+                flag = " ❌" if span["status"] == "error" else ""
+                print(f"   {offset:>8.2f} ms  {'  ' * depth}{span['service']}: {span['name']} ({span['duration_ms']:.2f} ms){flag}")
+                show(span["span_id"], depth + 1)
+
+        show(None, 0)
+
+
+if __name__ == "__main__":
+    import sys
+
+    print_waterfalls(sys.argv[1] if len(sys.argv) > 1 else TRACE_FILE or "traces.jsonl")